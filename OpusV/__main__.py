@@ -7,10 +7,16 @@ from pytgcalls.exceptions import NoActiveGroupCall
 import config
 from OpusV import LOGGER, app, userbot
 from OpusV.core.call import Space
+from OpusV.core.startup import startup
+from OpusV.core.userbot import assistants
 from OpusV.misc import sudo
 from OpusV.plugins import ALL_MODULES
+from OpusV.utils import http_client
+from OpusV.utils.blocking import loop_watchdog
+from OpusV.utils.extractor import extractor
 from OpusV.utils.database import get_banned_users, get_gbanned
 from OpusV.utils.cookie_handler import fetch_and_store_cookies 
+from OpusV.utils.stream.snapshot import restore_snapshot, save_snapshot
 from config import BANNED_USERS
 
 from OpusV.antispam import (
@@ -51,91 +57,140 @@ async def load_banned_users():
         LOGGER("OpusV").error(f"⚠️ Failed to load banned users: {e}")
 
 
-async def init():
-    if (
-        not config.STRING1
-        and not config.STRING2
-        and not config.STRING3
-        and not config.STRING4
-        and not config.STRING5
-    ):
-        LOGGER(__name__).error("⚠️ Activation Failed - Assistant sessions are missing.")
-        exit()
+async def start_bot() -> bool:
+    try:
+        await app.start()
+        LOGGER("OpusV").info("🚀 Bot client started successfully")
+        return True
+    except Exception as e:
+        LOGGER("OpusV").error(f"❌ Failed to start bot client: {e}")
+        return False
 
+
+async def load_cookies():
     try:
         await fetch_and_store_cookies()
         LOGGER("OpusV").info("🍪 Cookies Integrated - Y-t music stream ready.")
     except Exception as e:
         LOGGER("OpusV").warning(f"☁️ Cookie Warning - {e}")
 
-    # Load sudo users
-    await sudo()
 
-    # Load banned users with improved handling
-    await load_banned_users()
+async def start_assistant(number: int):
+    """Bring one assistant's userbot and call client up; it takes chats only once both are running."""
+    async with startup.phase(f"assistant {number}"):
+        if not await userbot.start_assistant(userbot.get(number), number):
+            return
+        if not await Space.start_assistant(number):
+            return
+    assistants.append(number)
+    assistants.sort()
+    startup.ready.set()
+
 
-    # Start the app
+async def check_log_call():
+    """Play a clip in the log group's voice chat to confirm an assistant can stream there."""
     try:
-        await app.start()
-        LOGGER("OpusV").info("🚀 Bot client started successfully")
+        await Space.stream_call("https://te.legra.ph/file/29f784eb49d230ab62e9e.mp4")
+        LOGGER("OpusV").info("📡 Voice stream test successful")
+    except NoActiveGroupCall:
+        LOGGER("OpusV").error("🔇 No Active VC - Log Group voice chat is dormant, start one for stream tests.")
     except Exception as e:
-        LOGGER("OpusV").error(f"❌ Failed to start bot client: {e}")
+        LOGGER("OpusV").warning(f"📡 Voice stream test warning: {e}")
+
+
+async def start_assistants():
+    """
+    Start every assistant concurrently and return as soon as one can serve.
+    The rest finish in the background and join the pool as they come up.
+    """
+    LOGGER("OpusV").info("ᴇʟᴇɢᴀɴᴄᴇ ɪɴ sᴏᴜɴᴅ ɪs ᴏɴ ᴛʜᴇ ᴡᴀʏ , sᴛᴀʀᴛɪɴɢ ᴀssɪsᴛᴀɴᴛs..")
+    bring_up = asyncio.gather(*(start_assistant(number) for number in userbot.clients))
+    first_ready = asyncio.ensure_future(startup.ready.wait())
+    await asyncio.wait([bring_up, first_ready], return_when=asyncio.FIRST_COMPLETED)
+    # Still pending when every assistant failed before any became ready
+    first_ready.cancel()
+    if not assistants:
+        LOGGER("OpusV").error("⚠️ Activation Failed - No assistant could be started.")
         exit()
 
-    # Initialize antispam system
-    try:
-        init_antispam()
-        app.add_handler(MessageHandler(global_antispam_handler, antispam_filter()))
-        LOGGER("OpusV").info("🛡️ Shields Up - Anti-Spam active.")
-    except Exception as e:
-        LOGGER("OpusV").error(f"⚠️ Failed to initialize antispam: {e}")
+    def all_up(_):
+        startup.report(f"👥 {len(assistants)}/{len(userbot.clients)} assistants up")
 
-    # Load all plugin modules
+    bring_up.add_done_callback(all_up)
+    return bring_up
+
+
+async def resume_calls(bring_up: asyncio.Future):
+    # Give the remaining assistants a moment so saved chats land back on their own assistant
+    await asyncio.wait([bring_up], timeout=30)
     try:
-        for all_module in ALL_MODULES:
-            importlib.import_module("OpusV.plugins" + all_module)
-        LOGGER("OpusV.plugins").info("🧩 Module Constellation - All systems synced.")
+        await restore_snapshot()
     except Exception as e:
-        LOGGER("OpusV").error(f"❌ Failed to load plugins: {e}")
+        LOGGER("OpusV").warning(f"⚠️ Call restore failed: {e}")
+
+
+async def init():
+    if config.LOOP_BLOCK_DEBUG:
+        loop_watchdog.start()
+
+    if not config.STRING_SESSIONS:
+        LOGGER(__name__).error("⚠️ Activation Failed - Assistant sessions are missing.")
         exit()
 
-    # Start userbot
-    try:
-        await userbot.start()
-        LOGGER("OpusV").info("👤 Userbot started successfully")
-    except Exception as e:
-        LOGGER("OpusV").error(f"⚠️ Userbot start failed: {e}")
+    startup.begin()
 
-    # Start voice chat system
-    try:
-        await Space.start()
-        LOGGER("OpusV").info("🎵 Voice system initialized")
-    except Exception as e:
-        LOGGER("OpusV").error(f"⚠️ Voice system failed: {e}")
+    # Start the extractor's worker server and warm the workers before boot gets busy
+    async with startup.phase("extractor"):
+        try:
+            await extractor.start()
+        except Exception as e:
+            LOGGER("OpusV").warning(f"⚠️ Extractor pool warmup failed: {e}")
+
+    # Bot login, cookies, sudo and ban lists don't depend on each other
+    async with startup.phase("bot"):
+        bot_started, *_ = await asyncio.gather(start_bot(), load_cookies(), sudo(), load_banned_users())
+    if not bot_started:
+        exit()
 
-    # Test voice chat connection
+    # Initialize antispam system
     try:
-        await Space.stream_call("https://te.legra.ph/file/29f784eb49d230ab62e9e.mp4")
-        LOGGER("OpusV").info("📡 Voice stream test successful")
-    except NoActiveGroupCall:
-        LOGGER("OpusV").error(
-            "🔇 No Active VC - Log Group voice chat is dormant.\n"
-            "💀 Aborting Opus Launch..."
-        )
-        exit()
+        init_antispam()
+        app.add_handler(MessageHandler(global_antispam_handler, antispam_filter()))
+        LOGGER("OpusV").info("🛡️ Shields Up - Anti-Spam active.")
     except Exception as e:
-        LOGGER("OpusV").warning(f"📡 Voice stream test warning: {e}")
+        LOGGER("OpusV").error(f"⚠️ Failed to initialize antispam: {e}")
 
-    # Finalize setup
+    # Stream update handlers go in before any call client starts
     try:
         await Space.decorators()
-        LOGGER("OpusV").info(
-            "⚡ Storm Online - Opus music sequence activated.\n"
-            "☁️ Part of Storm Servers × Opus Project."
-        )
     except Exception as e:
         LOGGER("OpusV").error(f"⚠️ Space decorators failed: {e}")
 
+    # Assistants and voice clients, all at once
+    bring_up = await start_assistants()
+
+    # Command handlers go in only once an assistant can serve, so an early
+    # /play can't land while there is nobody to place the call on
+    async with startup.phase("plugins"):
+        try:
+            for all_module in ALL_MODULES:
+                importlib.import_module("OpusV.plugins" + all_module)
+            LOGGER("OpusV.plugins").info("🧩 Module Constellation - All systems synced.")
+        except Exception as e:
+            LOGGER("OpusV").error(f"❌ Failed to load plugins: {e}")
+            exit()
+
+    Space.watch_assistants()
+    LOGGER("OpusV").info(
+        "⚡ Storm Online - Opus music sequence activated.\n"
+        "☁️ Part of Storm Servers × Opus Project."
+    )
+    startup.report("🚦 Accepting traffic")
+
+    asyncio.ensure_future(check_log_call())
+    if config.HOT_RESTART:
+        asyncio.ensure_future(resume_calls(bring_up))
+
     # Keep the bot running
     try:
         await idle()
@@ -145,6 +200,12 @@ async def init():
         LOGGER("OpusV").error(f"⚠️ Idle loop error: {e}")
     finally:
         # Cleanup
+        if config.HOT_RESTART:
+            try:
+                await save_snapshot()
+            except Exception as e:
+                LOGGER("OpusV").warning(f"⚠️ Call snapshot failed: {e}")
+
         try:
             await app.stop()
             LOGGER("OpusV").info("🤖 Bot client stopped")
@@ -156,6 +217,13 @@ async def init():
             LOGGER("OpusV").info("👤 Userbot stopped")
         except:
             pass
+
+        try:
+            await http_client.close()
+        except:
+            pass
+
+        extractor.close()
         
         LOGGER("OpusV").info("🌩️ Cycle Closed - Opus sleeps under the storm.")
 
@@ -1,11 +1,11 @@
 import asyncio
 import os
-from datetime import datetime, timedelta
-from typing import Union, Optional
+from datetime import datetime
+from typing import Dict, Optional, Union
 
 from ntgcalls import TelegramServerError
 from pyrogram import Client
-from pyrogram.errors import FloodWait, ChatAdminRequired
+from pyrogram.errors import FloodWait, ChatAdminRequired, InviteRequestSent, RPCError, UserNotParticipant
 from pyrogram.types import InlineKeyboardMarkup
 from pytgcalls import PyTgCalls
 from pytgcalls.exceptions import NoActiveGroupCall
@@ -18,31 +18,49 @@ from OpusV.misc import db
 from OpusV.utils.database import (
     add_active_chat,
     add_active_video_chat,
+    assistantdict,
+    get_assistant_number,
+    get_client,
     get_lang,
     get_loop,
     group_assistant,
+    is_active_chat,
     is_autoend,
+    music_off,
     music_on,
     remove_active_chat,
     remove_active_video_chat,
+    set_assistant_new,
     set_loop,
 )
 from OpusV.utils.exceptions import AssistantErr
 from OpusV.utils.formatters import check_duration, seconds_to_min, speed_converter
 from OpusV.utils.inline.play import stream_markup
+from OpusV.utils.media_store import media_store
+from OpusV.utils.placement import placement
 from OpusV.utils.stream.autoclear import auto_clean
+from OpusV.utils.stream.lazy import resolve_upcoming
+from OpusV.utils.stream.prefetch import prefetcher
+from OpusV.utils.stream.progressive import progressive_server, progressive_source, wait_complete
+from OpusV.utils.stream.state import ChatQueue, QueueItem
 from OpusV.utils.thumbnails import get_thumb
 from OpusV.utils.errors import capture_internal_err, send_large_error
+from OpusV.utils.scheduler import scheduler
 
-autoend = {}
 counter = {}
 
+AUTO_END_DELAY = 6 * 60  # seconds alone in the call before leaving
+SPEEDUP_WAIT = 60  # seconds /speed waits for a track that is still downloading
+# Join failures that count against the assistant in placement; anything else is the chat's or the media's fault
+ASSISTANT_ERRORS = (RPCError, ConnectionError, asyncio.TimeoutError)
+
 DEFAULT_AUDIO_QUALITY = AudioQuality.STUDIO
 DEFAULT_VIDEO_QUALITY = VideoQuality.HD_720p
 ELSE_AUDIO_QUALITY = AudioQuality.HIGH
 ELSE_VIDEO_QUALITY = VideoQuality.SD_360p
 
 def dynamic_media_stream(path: str, video: bool = False, ffmpeg_params: str = None) -> MediaStream:
+    path = progressive_source(path)
     return MediaStream(
         audio_path=path,
         media_path=path,
@@ -56,9 +74,10 @@ async def _clear_(chat_id: int) -> None:
     """Clear chat data and reset state"""
     try:
         popped = db.pop(chat_id, None)
-        if popped:
-            await auto_clean(popped)
-        db[chat_id] = []
+        for item in popped or []:
+            await auto_clean(item)
+        db[chat_id] = ChatQueue()
+        scheduler.cancel(("autoend", chat_id))
         await remove_active_video_chat(chat_id)
         await remove_active_chat(chat_id)
         await set_loop(chat_id, 0)
@@ -67,38 +86,30 @@ async def _clear_(chat_id: int) -> None:
 
 class Call:
     def __init__(self):
-        # STRING1 - no_updates=true flag after
-        self.userbot1 = Client(
-            "SpaceXAss1", config.API_ID, config.API_HASH, session_string=config.STRING1) if config.STRING1 else None
-        self.one = PyTgCalls(self.userbot1) if self.userbot1 else None
-
-        self.userbot2 = Client(
-            "SpaceXAss2", config.API_ID, config.API_HASH, session_string=config.STRING2) if config.STRING2 else None
-        self.two = PyTgCalls(self.userbot2) if self.userbot2 else None
-
-        self.userbot3 = Client(
-            "SpaceXAss3", config.API_ID, config.API_HASH, session_string=config.STRING3) if config.STRING3 else None
-        self.three = PyTgCalls(self.userbot3) if self.userbot3 else None
-
-        self.userbot4 = Client(
-            "SpaceXAss4", config.API_ID, config.API_HASH, session_string=config.STRING4) if config.STRING4 else None
-        self.four = PyTgCalls(self.userbot4) if self.userbot4 else None
-
-        self.userbot5 = Client(
-            "SpaceXAss5", config.API_ID, config.API_HASH, session_string=config.STRING5) if config.STRING5 else None
-        self.five = PyTgCalls(self.userbot5) if self.userbot5 else None
+        # Assistant number -> the call client and the PyTgCalls instance driving it
+        self.clients: Dict[int, Client] = {
+            number: Client(f"SpaceXAss{number}", config.API_ID, config.API_HASH, session_string=session)
+            for number, session in config.STRING_SESSIONS.items()
+        }
+        self.calls: Dict[int, PyTgCalls] = {number: PyTgCalls(client) for number, client in self.clients.items()}
 
         self.active_calls: set[int] = set()
+        self._migrating: set[int] = set()  # chats being moved right now, so a move isn't started twice
+        progressive_server.on_fallback = self._recover_progressive
 
     @capture_internal_err
     async def pause_stream(self, chat_id: int) -> None:
         assistant = await group_assistant(self, chat_id)
         await assistant.pause(chat_id)
+        if db.get(chat_id):
+            db[chat_id][0].paused()
 
     @capture_internal_err
     async def resume_stream(self, chat_id: int) -> None:
         assistant = await group_assistant(self, chat_id)
         await assistant.resume(chat_id)
+        if db.get(chat_id):
+            db[chat_id][0].resumed()
 
     @capture_internal_err
     async def mute_stream(self, chat_id: int) -> None:
@@ -199,7 +210,7 @@ class Call:
     async def speedup_stream(self, chat_id: int, file_path: str, speed: float, playing: list) -> None:
         """Unified speedup method with robust error handling"""
         # Validate input
-        if not isinstance(playing, list) or not playing or not isinstance(playing[0], dict):
+        if not playing or not isinstance(playing[0], QueueItem):
             raise AssistantErr("No active stream found for speedup")
         current_queue = db.get(chat_id, [])
         if not current_queue:
@@ -214,6 +225,9 @@ class Call:
             raise AssistantErr("Invalid speed value")
         if speed <= 0 or speed > 3.0:
             raise AssistantErr("Speed must be between 0.1 and 3.0")
+        # A track still streaming in progressively is an in-flight .part target; ffmpeg needs the whole file
+        if not await wait_complete(file_path, SPEEDUP_WAIT):
+            raise AssistantErr("Track is still downloading, try changing the speed again in a moment")
         assistant = await group_assistant(self, chat_id)
         if abs(speed - 1.0) < 0.01:
             out = file_path
@@ -273,34 +287,13 @@ class Call:
         played, con_seconds = speed_converter(playing[0]["played"], speed)
         duration = seconds_to_min(dur)
         is_video = playing[0].get("streamtype") == "video"
-        if is_video:
-            stream = MediaStream(
-                out,
-                audio_parameters=DEFAULT_AUDIO_QUALITY,
-                video_parameters=DEFAULT_VIDEO_QUALITY,
-                ffmpeg_parameters=f"-ss {played} -to {duration}",
-            )
-        else:
-            stream = MediaStream(
-                out,
-                audio_parameters=ELSE_AUDIO_QUALITY,
-                ffmpeg_parameters=f"-ss {played} -to {duration}",
-            )
+        stream = dynamic_media_stream(path=out, video=is_video, ffmpeg_params=f"-ss {played} -to {duration}")
         await assistant.play(chat_id, stream)
         try:
             current_queue = db.get(chat_id, [])
             if (current_queue and len(current_queue) > 0 and
                 str(current_queue[0].get("file", "")) == original_file_path):
-                if not current_queue[0].get("old_dur"):
-                    db[chat_id][0]["old_dur"] = db[chat_id][0]["dur"]
-                    db[chat_id][0]["old_second"] = db[chat_id][0]["seconds"]
-                db[chat_id][0].update({
-                    "played": con_seconds,
-                    "dur": duration,
-                    "seconds": dur,
-                    "speed_path": out,
-                    "speed": speed
-                })
+                current_queue[0].sped_up(speed, out, duration, dur, con_seconds)
         except (IndexError, KeyError) as e:
             LOGGER(__name__).warning(f"Could not update database after speedup: {e}")
 
@@ -309,7 +302,6 @@ class Call:
         assistant = await group_assistant(self, config.LOGGER_ID)
         try:
             await assistant.play(config.LOGGER_ID, MediaStream(link))
-            await asyncio.sleep(5)
         finally:
             try:
                 await assistant.leave_call(config.LOGGER_ID)
@@ -335,8 +327,20 @@ class Call:
         except (NoActiveGroupCall, ChatAdminRequired):
             raise AssistantErr(_["call_8"])
         except TelegramServerError:
+            placement.failure(await get_assistant_number(chat_id))
             raise AssistantErr(_["call_10"])
+        except FloodWait as e:
+            placement.failure(await get_assistant_number(chat_id), cooldown=e.value)
+            raise AssistantErr(
+                f"ᴜɴᴀʙʟᴇ ᴛᴏ ᴊᴏɪɴ ᴛʜᴇ ɢʀᴏᴜᴘ ᴄᴀʟʟ.\nRᴇᴀsᴏɴ: {e}"
+            )
+        except ASSISTANT_ERRORS as e:
+            placement.failure(await get_assistant_number(chat_id))
+            raise AssistantErr(
+                f"ᴜɴᴀʙʟᴇ ᴛᴏ ᴊᴏɪɴ ᴛʜᴇ ɢʀᴏᴜᴘ ᴄᴀʟʟ.\nRᴇᴀsᴏɴ: {e}"
+            )
         except Exception as e:
+            # Bad media and other problems with the request itself say nothing about the assistant
             raise AssistantErr(
                 f"ᴜɴᴀʙʟᴇ ᴛᴏ ᴊᴏɪɴ ᴛʜᴇ ɢʀᴏᴜᴘ ᴄᴀʟʟ.\nRᴇᴀsᴏɴ: {e}"
             )
@@ -350,7 +354,206 @@ class Call:
             counter[chat_id] = {}
             users = len(await assistant.get_participants(chat_id))
             if users == 1:
-                autoend[chat_id] = datetime.now() + timedelta(minutes=6)
+                scheduler.call_later(AUTO_END_DELAY, self.auto_end, chat_id, key=("autoend", chat_id))
+
+    def _assistant_calls(self, number: int) -> tuple:
+        """PyTgCalls instance and the pyrogram client behind it for an assistant number."""
+        number = int(number)
+        return self.calls.get(number), self.clients.get(number)
+
+    async def _ensure_member(self, number: int, chat_id: int) -> None:
+        userbot = await get_client(number)
+        try:
+            await app.get_chat_member(chat_id, userbot.id)
+            return
+        except UserNotParticipant:
+            pass
+        chat = await app.get_chat(chat_id)
+        invitelink = chat.username or await app.export_chat_invite_link(chat_id)
+        try:
+            await userbot.join_chat(invitelink)
+        except InviteRequestSent:
+            await app.approve_chat_join_request(chat_id, userbot.id)
+
+    async def _current_source(self, item: QueueItem) -> Optional[str]:
+        if item.speed_path:
+            return item.speed_path
+        file = str(item.file)
+        if "live_" in file or "vid_" in file:
+            if "vid_" in file:
+                if item.pinned and os.path.isfile(item.pinned):
+                    return item.pinned
+                path = media_store.get(item.vidid, "video" if item.streamtype == "video" else "audio")
+                if path:
+                    return path
+            n, link = await YouTube.video(item.vidid, True)
+            return link if n else None
+        if "index_" in file:
+            return item.vidid
+        return file
+
+    @staticmethod
+    def _stream_from(item: QueueItem, source: str, video: bool, played: int) -> MediaStream:
+        params = None
+        if item.seconds and played:
+            params = f"-ss {seconds_to_min(played)} -to {item.dur}"
+        return dynamic_media_stream(path=source, video=video, ffmpeg_params=params)
+
+    async def _recover_progressive(self, video_id: str, fmt: str, download) -> None:
+        """
+        A progressive download failed partway: hold the affected calls' clocks
+        while the fallback download runs, then restart them on the complete
+        file from where they stopped.
+        """
+        video = fmt == "video"
+        stalled = []
+        for chat_id in list(self.active_calls):
+            item = (db.get(chat_id) or [None])[0]
+            if item is None or item.vidid != video_id or item.speed_path:
+                continue
+            if "live_" in str(item.file) or "index_" in str(item.file):
+                continue
+            if (str(item.streamtype) == "video") != video or not item.running:
+                continue
+            item.paused()
+            stalled.append((chat_id, item))
+        path = await download
+        for chat_id, item in stalled:
+            current = db.get(chat_id)
+            if not current or current[0] is not item:
+                continue
+            try:
+                if path:
+                    assistant = await group_assistant(self, chat_id)
+                    await assistant.play(chat_id, self._stream_from(item, path, video, item.played))
+            except Exception as e:
+                LOGGER(__name__).warning(f"Restarting {chat_id} after a failed download failed: {e}")
+            item.resumed()
+
+    async def resume(self, chat_id: int, video: bool, paused: bool = False) -> bool:
+        """Rejoin a chat's call after a restart and continue its current track from the saved offset."""
+        item = db[chat_id][0]
+        if item.speed_path and not os.path.isfile(item.speed_path):
+            item.normal_speed()
+        source = await self._current_source(item)
+        if not source:
+            return False
+        played = item.played
+        assistant = await group_assistant(self, chat_id)
+        try:
+            try:
+                await assistant.play(chat_id, self._stream_from(item, source, video, played))
+            except (NoActiveGroupCall, ChatAdminRequired):
+                return False
+            except Exception:
+                # The assistant may have changed since the snapshot and not be in the chat yet
+                await self._ensure_member(await get_assistant_number(chat_id), chat_id)
+                await assistant.play(chat_id, self._stream_from(item, source, video, played))
+        except Exception as e:
+            LOGGER(__name__).warning(f"Resuming call in {chat_id} failed: {e}")
+            return False
+        item.played = played
+        item.resumed()
+        self.active_calls.add(chat_id)
+        await add_active_chat(chat_id)
+        await music_on(chat_id)
+        if video:
+            await add_active_video_chat(chat_id)
+        if paused:
+            await self.pause_stream(chat_id)
+            await music_off(chat_id)
+        return True
+
+    async def migrate(self, chat_id: int) -> bool:
+        """
+        Move a live call to another assistant: join the chat if needed, resume
+        the current track at its played offset there and persist the new
+        assignment. Returns False when no other assistant could take it.
+        """
+        from OpusV.core.userbot import assistants
+
+        check = db.get(chat_id)
+        old = await get_assistant_number(chat_id)
+        if not check or chat_id not in self.active_calls or chat_id in self._migrating:
+            return False
+        self._migrating.add(chat_id)
+        try:
+            item = check[0]
+            source = await self._current_source(item)
+            if not source:
+                return False
+            video = str(item.streamtype) == "video"
+            tried = {old}
+            left = False
+            while True:
+                candidates = [a for a in assistants if a not in tried]
+                if not candidates:
+                    break
+                new = placement.choose(candidates)
+                tried.add(new)
+                calls = self._assistant_calls(new)[0]
+                if calls is None:
+                    continue
+                played = item.played
+                try:
+                    await self._ensure_member(new, chat_id)
+                    old_calls = self._assistant_calls(old)[0] if old else None
+                    # Point the chat at the new assistant first so the old one's LEFT_CALL is ignored
+                    assistantdict[chat_id] = new
+                    if old_calls is not None and not left:
+                        left = True
+                        try:
+                            await old_calls.leave_call(chat_id)
+                        except Exception:
+                            pass
+                    await calls.play(chat_id, self._stream_from(item, source, video, played))
+                except Exception as e:
+                    LOGGER(__name__).warning(f"Migrating {chat_id} to assistant {new} failed: {e}")
+                    if isinstance(e, ASSISTANT_ERRORS):
+                        placement.failure(new)
+                    continue
+                item.played = played
+                placement.attach(chat_id, new)
+                if video:
+                    placement.video_on(chat_id)
+                await set_assistant_new(chat_id, new)
+                LOGGER(__name__).info(f"Migrated call in {chat_id} from assistant {old} to {new}")
+                return True
+        finally:
+            self._migrating.discard(chat_id)
+        if left:
+            # The old call is gone and nobody took over; clean up like a normal stop
+            await self.stop_stream(chat_id)
+        return False
+
+    async def check_assistants(self) -> None:
+        """Move calls off assistants that are disconnected or cooling down."""
+        from OpusV.core.userbot import assistants
+
+        if len(assistants) < 2:
+            return
+        for number in assistants:
+            _calls, client = self._assistant_calls(number)
+            connected = client is not None and client.is_connected
+            if connected and placement.healthy(number):
+                continue
+            for chat_id in placement.chats_of(number):
+                await self.migrate(chat_id)
+
+    async def auto_end(self, chat_id: int) -> None:
+        if not await is_autoend() or not await is_active_chat(chat_id):
+            return
+        try:
+            await self.stop_stream(chat_id)
+        except:
+            return
+        try:
+            await app.send_message(
+                chat_id,
+                "» ʙᴏᴛ ᴀᴜᴛᴏᴍᴀᴛɪᴄᴀʟʟʏ ʟᴇғᴛ ᴠɪᴅᴇᴏᴄʜᴀᴛ ʙᴇᴄᴀᴜsᴇ ɴᴏ ᴏɴᴇ ᴡᴀs ʟɪsᴛᴇɴɪɴɢ ᴏɴ ᴠɪᴅᴇᴏᴄʜᴀᴛ.",
+            )
+        except:
+            pass
 
 
     @capture_internal_err
@@ -365,6 +568,7 @@ class Call:
                 loop = loop - 1
                 await set_loop(chat_id, loop)
             await auto_clean(popped)
+            await resolve_upcoming(chat_id, 1)
             if not check:
                     await _clear_(chat_id)
                     if chat_id in self.active_calls:
@@ -385,6 +589,7 @@ class Call:
                 return
         else:
             queued = check[0]["file"]
+            prefetcher.schedule(chat_id)
             language = await get_lang(chat_id)
             _ = get_string(language)
             title = (check[0]["title"]).title()
@@ -392,14 +597,7 @@ class Call:
             original_chat_id = check[0]["chat_id"]
             streamtype = check[0]["streamtype"]
             videoid = check[0]["vidid"]
-            db[chat_id][0]["played"] = 0
-
-            exis = (check[0]).get("old_dur")
-            if exis:
-                db[chat_id][0]["dur"] = exis
-                db[chat_id][0]["seconds"] = check[0]["old_second"]
-                db[chat_id][0]["speed_path"] = None
-                db[chat_id][0]["speed"] = 1.0
+            db[chat_id][0].started()
 
             video = True if str(streamtype) == "video" else False
 
@@ -427,8 +625,7 @@ class Call:
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                db[chat_id][0].shown(run, "tg")
 
             elif "vid_" in queued:
                 mystic = await app.send_message(original_chat_id, _["call_7"])
@@ -443,6 +640,9 @@ class Call:
                     return await mystic.edit_text(
                         _["call_6"], disable_web_page_preview=True
                     )
+                if direct and check[0].get("pinned") != file_path:
+                    media_store.pin(file_path)
+                    db[chat_id][0]["pinned"] = file_path
 
                 stream = dynamic_media_stream(path=file_path, video=video)
                 try:
@@ -464,8 +664,7 @@ class Call:
                     ),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
+                db[chat_id][0].shown(run, "stream")
 
             elif "index_" in queued:
                 stream = dynamic_media_stream(path=videoid, video=video)
@@ -481,8 +680,7 @@ class Call:
                     caption=_["stream_2"].format(user),
                     reply_markup=InlineKeyboardMarkup(button),
                 )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "tg"
+                db[chat_id][0].shown(run, "tg")
 
             else:
                 stream = dynamic_media_stream(path=queued, video=video)
@@ -505,8 +703,7 @@ class Call:
                         ),
                         reply_markup=InlineKeyboardMarkup(button),
                     )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "tg"
+                    db[chat_id][0].shown(run, "tg")
 
                 elif videoid == "soundcloud":
                     button = stream_markup(_, chat_id)
@@ -518,8 +715,7 @@ class Call:
                         ),
                         reply_markup=InlineKeyboardMarkup(button),
                     )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "tg"
+                    db[chat_id][0].shown(run, "tg")
 
                 else:
                     img = await get_thumb(videoid)
@@ -550,41 +746,35 @@ class Call:
                             ),
                             reply_markup=InlineKeyboardMarkup(button),
                         )
-                    db[chat_id][0]["mystic"] = run
-                    db[chat_id][0]["markup"] = "stream"
-
-
-    async def start(self) -> None:
-        LOGGER(__name__).info("Starting PyTgCalls Clients...")
-        if config.STRING1:
-            await self.one.start()
-        if config.STRING2:
-            await self.two.start()
-        if config.STRING3:
-            await self.three.start()
-        if config.STRING4:
-            await self.four.start()
-        if config.STRING5:
-            await self.five.start()
+                    db[chat_id][0].shown(run, "stream")
+
+
+    async def start_assistant(self, number: int) -> bool:
+        try:
+            await self.calls[number].start()
+            return True
+        except Exception as e:
+            LOGGER(__name__).error(f"PyTgCalls client {number} failed to start: {e}")
+            return False
+
+    def watch_assistants(self) -> None:
+        if config.LIVE_MIGRATION:
+            scheduler.every(config.MIGRATION_CHECK_INTERVAL, self.check_assistants, key="assistant-health")
+
+    def _stale_update(self, client, chat_id: int) -> bool:
+        """Updates from an assistant the chat was just moved off of must not end its stream."""
+        # Decided by sender alone, not by an in-progress migration: once the chat points at the
+        # new assistant (before its play() is even awaited) that assistant's StreamEnded counts
+        current = assistantdict.get(chat_id)
+        return current is not None and self._assistant_calls(current)[0] not in (None, client)
 
     @capture_internal_err
     async def ping(self) -> str:
-        pings = []
-        if config.STRING1:
-            pings.append(self.one.ping)
-        if config.STRING2:
-            pings.append(self.two.ping)
-        if config.STRING3:
-            pings.append(self.three.ping)
-        if config.STRING4:
-            pings.append(self.four.ping)
-        if config.STRING5:
-            pings.append(self.five.ping)
+        pings = [calls.ping for calls in self.calls.values()]
         return str(round(sum(pings) / len(pings), 3)) if pings else "0.0"
 
     @capture_internal_err
     async def decorators(self) -> None:
-        assistants = list(filter(None, [self.one, self.two, self.three, self.four, self.five]))
 
         CRITICAL = (
             ChatUpdate.Status.KICKED
@@ -596,6 +786,8 @@ class Call:
 
         async def unified_update_handler(client, update: Update) -> None:
             try:
+                if self._stale_update(client, update.chat_id):
+                    return
                 if isinstance(update, ChatUpdate):
                     status = update.status
                     if (status & ChatUpdate.Status.LEFT_CALL) or (status & CRITICAL):
@@ -619,8 +811,8 @@ class Call:
                 filename = f"update_error_{getattr(update, 'chat_id', 'unknown')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
                 await send_large_error(full_trace, caption, filename)
 
-        for assistant in assistants:
-            assistant.on_update()(unified_update_handler)
+        for calls in self.calls.values():
+            calls.on_update()(unified_update_handler)
 
 
 Space = Call()
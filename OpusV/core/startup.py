@@ -0,0 +1,64 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import List, Tuple
+
+import config
+from ..logging import LOGGER
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second with up to ``burst`` banked; ``acquire`` waits for a token."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class Startup:
+    """
+    Times the boot phases and tracks readiness. ``ready`` is set once the bot
+    client and at least one assistant can serve, which is when traffic is
+    accepted; slower assistants keep coming up in the background.
+    """
+
+    def __init__(self):
+        self.timings: List[Tuple[str, float]] = []
+        self.ready = asyncio.Event()
+        self._began = time.monotonic()
+
+    def begin(self) -> None:
+        self._began = time.monotonic()
+
+    @asynccontextmanager
+    async def phase(self, name: str):
+        began = time.monotonic()
+        try:
+            yield
+        finally:
+            self.timings.append((name, time.monotonic() - began))
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self._began
+
+    def report(self, label: str) -> None:
+        phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.timings)
+        LOGGER(__name__).info(f"⏱️ {label} in {self.elapsed():.2f}s ({phases})")
+
+
+join_limiter = TokenBucket(config.JOIN_RATE, config.JOIN_BURST)
+startup = Startup()
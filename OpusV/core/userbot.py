@@ -1,7 +1,10 @@
 from pyrogram import Client
+from pyrogram.errors import FloodWait
 import asyncio
+from typing import Dict, Optional
 import config
 from ..logging import LOGGER
+from .startup import join_limiter
 
 assistants = []
 assistantids = []
@@ -17,67 +20,25 @@ GROUPS_TO_JOIN = [
 
 class Userbot:
     def __init__(self):
-        self.one = Client(
-            "SpaceXAss1",
-            config.API_ID,
-            config.API_HASH,
-            session_string=str(config.STRING1),
-            no_updates=True,
-        )
-        self.two = Client(
-            "SpaceXAss2",
-            config.API_ID,
-            config.API_HASH,
-            session_string=str(config.STRING2),
-            no_updates=True,
-        )
-        self.three = Client(
-            "SpaceXAss3",
-            config.API_ID,
-            config.API_HASH,
-            session_string=str(config.STRING3),
-            no_updates=True,
-        )
-        self.four = Client(
-            "SpaceXAss4",
-            config.API_ID,
-            config.API_HASH,
-            session_string=str(config.STRING4),
-            no_updates=True,
-        )
-        self.five = Client(
-            "SpaceXAss5",
-            config.API_ID,
-            config.API_HASH,
-            session_string=str(config.STRING5),
-            no_updates=True,
-        )
+        # Assistant number -> client, one per configured STRING_SESSION<n>
+        self.clients: Dict[int, Client] = {
+            number: Client(
+                f"SpaceXAss{number}",
+                config.API_ID,
+                config.API_HASH,
+                session_string=str(session),
+                no_updates=True,
+            )
+            for number, session in config.STRING_SESSIONS.items()
+        }
+        self._joins = set()
 
-    async def start_assistant(self, client: Client, index: int):
-        string_attr = [
-            config.STRING1,
-            config.STRING2,
-            config.STRING3,
-            config.STRING4,
-            config.STRING5,
-        ][index - 1]
-        if not string_attr:
-            return
+    def get(self, index: int) -> Optional[Client]:
+        return self.clients.get(int(index))
 
+    async def start_assistant(self, client: Client, index: int) -> bool:
         try:
             await client.start()
-            
-            # Add small delay before joining groups to prevent rate limiting
-            await asyncio.sleep(1)
-            
-            for group in GROUPS_TO_JOIN:
-                try:
-                    await client.join_chat(group)
-                    await asyncio.sleep(0.5)  # Small delay between joins
-                except Exception:
-                    pass
-
-            assistants.append(index)
 
             try:
                 await client.send_message(
@@ -97,40 +58,34 @@ class Userbot:
 
         except Exception as e:
             LOGGER(__name__).error(f"Fᴀɪʟᴇᴅ ᴛᴏ sᴛᴀʀᴛ ᴀssɪsᴛᴀɴᴛ {index}: {e}")
+            return False
+
+        # Support-group joins don't gate readiness; they trickle through the shared limiter
+        task = asyncio.ensure_future(self.join_groups(client))
+        self._joins.add(task)
+        task.add_done_callback(self._joins.discard)
+        return True
 
-    async def start(self):
-        LOGGER(__name__).info("ᴇʟᴇɢᴀɴᴄᴇ ɪɴ sᴏᴜɴᴅ ɪs ᴏɴ ᴛʜᴇ ᴡᴀʏ , sᴛᴀʀᴛɪɴɢ ᴀssɪsᴛᴀɴᴛs..")
-        
-        # Stagger client starts to reduce concurrent load
-        clients = [
-            (self.one, 1),
-            (self.two, 2),
-            (self.three, 3),
-            (self.four, 4),
-            (self.five, 5)
-        ]
-        
-        for client, index in clients:
-            await self.start_assistant(client, index)
-            await asyncio.sleep(2)  # 2-second delay between each client start
+    async def join_groups(self, client: Client):
+        for group in GROUPS_TO_JOIN:
+            while True:
+                await join_limiter.acquire()
+                try:
+                    await client.join_chat(group)
+                except FloodWait as e:
+                    # Wait it out, then try the same group again
+                    await asyncio.sleep(e.value)
+                    continue
+                except Exception:
+                    pass
+                break
 
     async def stop(self):
         LOGGER(__name__).info("sᴛᴏᴘᴘɪɴɢ ᴛʜᴇ ᴇʟᴇɢᴀɴᴄʏ ᴏғ ᴏᴘᴜs ᴀssɪsᴛᴀɴᴛ ᴡɪᴛʜ ᴇᴀsᴇ...")
-        try:
-            # Stop clients with delays to prevent connection issues
-            if config.STRING1:
-                await self.one.stop()
-                await asyncio.sleep(0.5)
-            if config.STRING2:
-                await self.two.stop()
-                await asyncio.sleep(0.5)
-            if config.STRING3:
-                await self.three.stop()
-                await asyncio.sleep(0.5)
-            if config.STRING4:
-                await self.four.stop()
-                await asyncio.sleep(0.5)
-            if config.STRING5:
-                await self.five.stop()
-        except Exception as e:
-            LOGGER(__name__).error(f"Eʀʀᴏʀ ᴡʜɪʟᴇ sᴛᴏᴘɪɴɢ ᴀssɪsᴛᴀɴᴛ: {e}")
+        for task in list(self._joins):
+            task.cancel()
+        clients = [client for client in self.clients.values() if client.is_connected]
+        results = await asyncio.gather(*(client.stop() for client in clients), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                LOGGER(__name__).error(f"Eʀʀᴏʀ ᴡʜɪʟᴇ sᴛᴏᴘɪɴɢ ᴀssɪsᴛᴀɴᴛ: {result}")
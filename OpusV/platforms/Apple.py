@@ -1,9 +1,10 @@
 import re
 from typing import Union
 
-import aiohttp
-from bs4 import BeautifulSoup
-from youtubesearchpython.__future__ import VideosSearch
+from OpusV.platforms.Youtube import match_track
+from OpusV.utils.cache import MISSING
+from OpusV.utils.html_meta import fetch_head_meta, meta_value
+from OpusV.utils.identity import identity_cache, track_details, url_key
 
 
 class AppleAPI:
@@ -20,52 +21,32 @@ class AppleAPI:
     async def track(self, url, playid: Union[bool, str] = None):
         if playid:
             url = self.base + url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        search = None
-        for tag in soup.find_all("meta"):
-            if tag.get("property", None) == "og:title":
-                search = tag.get("content", None)
-        if search is None:
+        key = url_key("apple", url)
+        video = await identity_cache.get(key)
+        if video is MISSING:
+            meta = await fetch_head_meta(url)
+            if meta is None:
+                return False
+            search = meta_value(meta, "og:title")
+            if search is None:
+                return False
+            video = await match_track(search, key)
+        if not video:
             return False
-        results = VideosSearch(search, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-            ytlink = result["link"]
-            vidid = result["id"]
-            duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-        track_details = {
-            "title": title,
-            "link": ytlink,
-            "vidid": vidid,
-            "duration_min": duration_min,
-            "thumb": thumbnail,
-        }
-        return track_details, vidid
+        return track_details(video), video["id"]
 
     async def playlist(self, url, playid: Union[bool, str] = None):
         if playid:
             url = self.base + url
         playlist_id = url.split("playlist/")[1]
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        applelinks = soup.find_all("meta", attrs={"property": "music:song"})
+        meta = await fetch_head_meta(url)
+        if meta is None:
+            return False
         results = []
-        for item in applelinks:
+        for item in meta.get("music:song", []):
             try:
-                xx = (((item["content"]).split("album/")[1]).split("/")[0]).replace(
-                    "-", " "
-                )
+                xx = ((item.split("album/")[1]).split("/")[0]).replace("-", " ")
             except:
-                xx = ((item["content"]).split("album/")[1]).split("/")[0]
+                continue
             results.append(xx)
         return results, playlist_id
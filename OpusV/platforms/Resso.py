@@ -1,9 +1,10 @@
 import re
 from typing import Union
 
-import aiohttp
-from bs4 import BeautifulSoup
-from youtubesearchpython.__future__ import VideosSearch
+from OpusV.platforms.Youtube import match_track
+from OpusV.utils.cache import MISSING
+from OpusV.utils.html_meta import fetch_head_meta, meta_value
+from OpusV.utils.identity import identity_cache, track_details, url_key
 
 
 class RessoAPI:
@@ -20,35 +21,17 @@ class RessoAPI:
     async def track(self, url, playid: Union[bool, str] = None):
         if playid:
             url = self.base + url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        for tag in soup.find_all("meta"):
-            if tag.get("property", None) == "og:title":
-                title = tag.get("content", None)
-            if tag.get("property", None) == "og:description":
-                des = tag.get("content", None)
-                try:
-                    des = des.split("·")[0]
-                except:
-                    pass
-        if des == "":
+        key = url_key("resso", url)
+        video = await identity_cache.get(key)
+        if video is MISSING:
+            meta = await fetch_head_meta(url)
+            if meta is None:
+                return False
+            title = meta_value(meta, "og:title")
+            des = (meta_value(meta, "og:description") or "").split("·")[0]
+            if not des or not title:
+                return
+            video = await match_track(title, key)
+        if not video:
             return
-        results = VideosSearch(title, limit=1)
-        for result in (await results.next())["result"]:
-            title = result["title"]
-            ytlink = result["link"]
-            vidid = result["id"]
-            duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-        track_details = {
-            "title": title,
-            "link": ytlink,
-            "vidid": vidid,
-            "duration_min": duration_min,
-            "thumb": thumbnail,
-        }
-        return track_details, vidid
+        return track_details(video), video["id"]
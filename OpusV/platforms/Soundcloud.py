@@ -1,9 +1,13 @@
+import threading
 from os import path
 
 from yt_dlp import YoutubeDL
 
+from OpusV.utils.blocking import cancel_hook, run_blocking
 from OpusV.utils.formatters import seconds_to_min
 
+DOWNLOAD_TIMEOUT = 300
+
 
 class SoundAPI:
     def __init__(self):
@@ -21,11 +25,15 @@ class SoundAPI:
         else:
             return False
 
+    def _extract(self, url, cancel: threading.Event):
+        with YoutubeDL({**self.opts, "progress_hooks": [cancel_hook(cancel)]}) as d:
+            return d.extract_info(url)
+
     async def download(self, url):
-        d = YoutubeDL(self.opts)
+        cancel = threading.Event()
         try:
-            info = d.extract_info(url)
-        except:
+            info = await run_blocking(self._extract, url, cancel, timeout=DOWNLOAD_TIMEOUT, cancel=cancel)
+        except Exception:
             return False
         xyz = path.join("downloads", f"{info['id']}.{info['ext']}")
         duration_min = seconds_to_min(info["duration"])
@@ -1,10 +1,27 @@
+import asyncio
 import re
+from typing import Dict, List, Optional, Tuple
 
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
-from youtubesearchpython.__future__ import VideosSearch
 
 import config
+from OpusV.platforms.Youtube import match_track, search_cache
+from OpusV.utils.blocking import run_blocking
+from OpusV.utils.cache import MISSING, normalize_key
+from OpusV.utils.identity import identity_cache, identity_key, track_details
+from OpusV.utils.video_cache import video_cache
+
+SPOTIFY_TIMEOUT = 30
+
+
+def _query(track: Dict) -> str:
+    info = track["name"]
+    for artist in track["artists"]:
+        fetched = f' {artist["name"]}'
+        if "Various Artists" not in fetched:
+            info += fetched
+    return info
 
 
 class SpotifyAPI:
@@ -21,6 +38,8 @@ class SpotifyAPI:
             )
         else:
             self.spotify = None
+        self._match_slots: Optional[asyncio.Semaphore] = None
+        self._tasks = set()
 
     async def valid(self, link: str):
         if re.search(self.regex, link):
@@ -28,71 +47,89 @@ class SpotifyAPI:
         else:
             return False
 
+    async def _call(self, method, *args):
+        # spotipy is blocking (requests), keep it off the event loop
+        return await run_blocking(method, *args, timeout=SPOTIFY_TIMEOUT)
+
+    async def _collect(self, page: Dict, limit: int = config.PLAYLIST_FETCH_LIMIT) -> List[Dict]:
+        tracks = []
+        while page:
+            for item in page["items"]:
+                # Playlist pages wrap each track, album pages list them directly
+                track = item["track"] if "track" in item else item
+                if track and track.get("name"):
+                    tracks.append(track)
+            if len(tracks) >= limit or not page.get("next"):
+                break
+            page = await self._call(self.spotify.next, page)
+        return tracks[:limit]
+
+    async def _entries(self, tracks: List[Dict]) -> List[str]:
+        """
+        Search queries for ``tracks`` in order. Tracks matched before get their
+        YouTube result seeded into the search cache so resolving them costs no
+        search; the rest are matched in the background.
+        """
+        keys = {t["id"]: identity_key("spotify", t["id"]) for t in tracks if t.get("id")}
+        known = await identity_cache.get_many(keys.values())
+        entries, unmatched = [], []
+        for track in tracks:
+            query = _query(track)
+            entries.append(query)
+            key = keys.get(track.get("id"))
+            if key is None:
+                continue
+            if key not in known:
+                unmatched.append((key, query))
+                continue
+            video = known[key]
+            if video:
+                search_cache.set(normalize_key(query), [video], persist=False)
+                if video_cache.peek(video["id"]) is MISSING:
+                    video_cache.set(video["id"], video, persist=False)
+        if unmatched:
+            task = asyncio.ensure_future(self._match(unmatched))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return entries
+
+    async def _match_one(self, key: str, query: str) -> Optional[Dict]:
+        if self._match_slots is None:
+            self._match_slots = asyncio.Semaphore(config.PLAYLIST_RESOLVE_CONCURRENCY)
+        async with self._match_slots:
+            return await match_track(query, key)
+
+    async def _match(self, unmatched: List[Tuple[str, str]]) -> None:
+        await asyncio.gather(*(self._match_one(key, query) for key, query in unmatched))
+
     async def track(self, link: str):
-        track = self.spotify.track(link)
-        info = track["name"]
-        for artist in track["artists"]:
-            fetched = f' {artist["name"]}'
-            if "Various Artists" not in fetched:
-                info += fetched
-        results = VideosSearch(info, limit=1)
-        for result in (await results.next())["result"]:
-            ytlink = result["link"]
-            title = result["title"]
-            vidid = result["id"]
-            duration_min = result["duration"]
-            thumbnail = result["thumbnails"][0]["url"].split("?")[0]
-        track_details = {
-            "title": title,
-            "link": ytlink,
-            "vidid": vidid,
-            "duration_min": duration_min,
-            "thumb": thumbnail,
-        }
-        return track_details, vidid
+        match = re.search(r"track/([A-Za-z0-9]+)", link)
+        key = identity_key("spotify", match.group(1)) if match else None
+        video = await identity_cache.get(key) if key else MISSING
+        if video is MISSING:
+            track = await self._call(self.spotify.track, link)
+            # Someone is waiting on this one, don't queue it behind background matching
+            video = await match_track(_query(track), identity_key("spotify", track["id"]))
+        if not video:
+            raise ValueError("No YouTube match for Spotify track")
+        return track_details(video), video["id"]
 
     async def playlist(self, url):
-        playlist = self.spotify.playlist(url)
-        playlist_id = playlist["id"]
-        results = []
-        for item in playlist["tracks"]["items"]:
-            music_track = item["track"]
-            info = music_track["name"]
-            for artist in music_track["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-        return results, playlist_id
+        playlist = await self._call(self.spotify.playlist, url)
+        tracks = await self._collect(playlist["tracks"])
+        return await self._entries(tracks), playlist["id"]
 
     async def album(self, url):
-        album = self.spotify.album(url)
-        album_id = album["id"]
-        results = []
-        for item in album["tracks"]["items"]:
-            info = item["name"]
-            for artist in item["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-
+        album = await self._call(self.spotify.album, url)
+        tracks = await self._collect(album["tracks"])
         return (
-            results,
-            album_id,
+            await self._entries(tracks),
+            album["id"],
         )
 
     async def artist(self, url):
-        artistinfo = self.spotify.artist(url)
-        artist_id = artistinfo["id"]
-        results = []
-        artisttoptracks = self.spotify.artist_top_tracks(url)
-        for item in artisttoptracks["tracks"]:
-            info = item["name"]
-            for artist in item["artists"]:
-                fetched = f' {artist["name"]}'
-                if "Various Artists" not in fetched:
-                    info += fetched
-            results.append(info)
-
-        return results, artist_id
+        artistinfo, toptracks = await asyncio.gather(
+            self._call(self.spotify.artist, url),
+            self._call(self.spotify.artist_top_tracks, url),
+        )
+        return await self._entries(toptracks["tracks"]), artistinfo["id"]
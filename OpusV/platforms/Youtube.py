@@ -1,43 +1,73 @@
 import asyncio
-import json
 import re
 from typing import Dict, List, Optional, Tuple, Union
 
-import yt_dlp
 from pyrogram.enums import MessageEntityType
 from pyrogram.types import Message
 from youtubesearchpython.__future__ import VideosSearch
 
+import config
+from OpusV.core.mongo import mongodb
+from OpusV.utils.cache import MISSING, TieredCache, normalize_key
 from OpusV.utils.database import is_on_off
 from OpusV.utils.downloader import yt_dlp_download, download_audio_concurrent, download_video_concurrent
 from OpusV.utils.errors import capture_internal_err
+from OpusV.utils.extractor import extractor
 from OpusV.utils.formatters import time_to_seconds
+from OpusV.utils.identity import remember_identity
+from OpusV.utils.stream.progressive import download_audio_progressive
+from OpusV.utils.video_cache import VIDEO_ID_RE, from_ytdlp, get_video, remember_videos, video_cache, video_id_of
 
-cookies_file = "OpusV/resources/cookies.txt"
-_cache = {}
+TRACK_KEYS = ("id", "title", "duration", "thumbnail", "webpage_url", "uploader", "channel", "is_live")
+search_cache = TieredCache(
+    "search",
+    maxsize=config.SEARCH_CACHE_SIZE,
+    ttl=config.SEARCH_CACHE_TTL,
+    collection=mongodb.searchcache if config.PERSISTENT_CACHE else None,
+)
 
 
-@capture_internal_err
-async def shell_cmd(cmd: str) -> str:
-    proc = await asyncio.create_subprocess_shell(
-        cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-    )
-    out, err = await proc.communicate()
-    return (out or err).decode()
+_inflight_searches: Dict[str, asyncio.Task] = {}
 
 
-@capture_internal_err
-async def cached_youtube_search(query: str) -> List[Dict]:
-    if query in _cache:
-        return _cache[query]
+async def _search(query: str, key: str) -> List[Dict]:
     search = VideosSearch(query, limit=1)
     results = await search.next()
     result_data = results.get("result", [])
     if result_data:
-        _cache[query] = result_data
+        search_cache.set(key, result_data)
+        remember_videos(result_data)
     return result_data
 
 
+@capture_internal_err
+async def cached_youtube_search(query: str) -> List[Dict]:
+    key = normalize_key(query)
+    cached = await search_cache.get(key)
+    if cached is not MISSING:
+        return cached
+    # Concurrent callers (playlist resolution, background matching) share one search
+    task = _inflight_searches.get(key)
+    if task is None:
+        task = _inflight_searches[key] = asyncio.ensure_future(_search(query, key))
+        task.add_done_callback(lambda _: _inflight_searches.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def match_track(query: str, *keys: str) -> Optional[Dict]:
+    """
+    Best YouTube result for a track from another platform, remembered under
+    each identity key. A search that errors out is not cached as "no match".
+    """
+    results = await cached_youtube_search(query)
+    if results is None:
+        return None
+    video = results[0] if results else None
+    for key in keys:
+        remember_identity(key, video)
+    return video
+
+
 class YouTubeAPI:
     def __init__(self) -> None:
         self.base_url = "https://www.youtube.com/watch?v="
@@ -47,6 +77,8 @@ class YouTubeAPI:
     def _prepare_link(self, link: str, videoid: Union[str, bool, None] = None) -> str:
         if isinstance(videoid, str) and videoid.strip():
             link = self.base_url + videoid.strip()
+        elif videoid is True and VIDEO_ID_RE.fullmatch(link):
+            link = self.base_url + link
         if "youtu.be" in link:
             link = self.base_url + link.split("/")[-1].split("?")[0]
         elif "youtube.com/shorts/" in link or "youtube.com/live/" in link:
@@ -72,28 +104,34 @@ class YouTubeAPI:
 
     @capture_internal_err
     async def _fetch_video_info(self, query: str, *, use_cache: bool = True) -> Optional[Dict]:
+        video_id = video_id_of(query) if query.startswith("http") else None
+        if use_cache and video_id:
+            cached = await get_video(video_id)
+            if cached is not MISSING:
+                return cached
         if use_cache and not query.startswith("http"):
             result = await cached_youtube_search(query)
         else:
             search = VideosSearch(query, limit=1)
             result = (await search.next()).get("result", [])
+            remember_videos(result)
+            if video_id and not result:
+                video_cache.set(video_id, None)
         return result[0] if result else None
 
     @capture_internal_err
     async def is_live(self, link: str) -> bool:
         prepared = self._prepare_link(link)
-        proc = await asyncio.create_subprocess_exec(
-            "yt-dlp", "--cookies", cookies_file, "--dump-json", prepared,
-            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-        )
-        stdout, _ = await proc.communicate()
-        if not stdout:
-            return False
+        cached = await get_video(video_id_of(prepared))
+        if cached and cached.get("is_live") is not None:
+            return bool(cached["is_live"])
         try:
-            info = json.loads(stdout.decode())
-            return bool(info.get("is_live"))
-        except json.JSONDecodeError:
+            info = await extractor.extract(prepared, keys=TRACK_KEYS)
+        except Exception:
             return False
+        if info.get("id"):
+            video_cache.set(info["id"], from_ytdlp(info))
+        return bool(info.get("is_live"))
 
     @capture_internal_err
     async def details(self, link: str, videoid: Union[str, bool, None] = None) -> Tuple[str, Optional[str], int, str, str]:
@@ -129,24 +167,27 @@ class YouTubeAPI:
     @capture_internal_err
     async def video(self, link: str, videoid: Union[str, bool, None] = None) -> Tuple[int, str]:
         link = self._prepare_link(link, videoid)
-        proc = await asyncio.create_subprocess_exec(
-            "yt-dlp", "--cookies", cookies_file, "-g", "-f", "best[height<=?720][width<=?1280]",
-            link, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        opts = extractor.options(format="best[height<=?720][width<=?1280]")
+        try:
+            info = await extractor.extract(link, opts, keys=("url", "requested_formats"))
+        except Exception as e:
+            return 0, str(e)
+        url = info.get("url") or next(
+            (f.get("url") for f in info.get("requested_formats") or [] if f.get("url")), None
         )
-        stdout, stderr = await proc.communicate()
-        return (1, stdout.decode().split("\n")[0]) if stdout else (0, stderr.decode())
+        return (1, url) if url else (0, "No stream url found")
 
     @capture_internal_err
     async def playlist(self, link: str, limit: int, user_id, videoid: Union[str, bool, None] = None) -> List[str]:
         if videoid:
             link = self.playlist_url + str(videoid)
         link = link.split("&")[0]
-        cmd = (
-            f"yt-dlp --cookies {cookies_file} -i --get-id --flat-playlist "
-            f"--playlist-end {limit} --skip-download {link}"
-        )
-        data = await shell_cmd(cmd)
-        return [item for item in data.strip().split("\n") if item]
+        opts = extractor.options(extract_flat="in_playlist", playlistend=limit, ignoreerrors=True)
+        try:
+            info = await extractor.extract(link, opts, keys=("entries",))
+        except Exception:
+            return []
+        return [entry["id"] for entry in info.get("entries") or [] if entry and entry.get("id")]
 
     @capture_internal_err
     async def track(self, link: str, videoid: Union[str, bool, None] = None) -> Tuple[Dict, str]:
@@ -156,17 +197,12 @@ class YouTubeAPI:
                 raise ValueError("Track not found via API")
         except Exception:
             prepared = self._prepare_link(link, videoid)
-            proc = await asyncio.create_subprocess_exec(
-                "yt-dlp", "--cookies", cookies_file, "--dump-json", prepared,
-                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-            stdout, _ = await proc.communicate()
-            if not stdout:
-                raise ValueError("Track not found (yt-dlp fallback)")
             try:
-                info = json.loads(stdout.decode())
-            except json.JSONDecodeError:
-                raise ValueError("Failed to parse yt-dlp output")
+                info = await extractor.extract(prepared, keys=TRACK_KEYS)
+            except Exception:
+                raise ValueError("Track not found (yt-dlp fallback)")
+            if info.get("id"):
+                video_cache.set(info["id"], from_ytdlp(info))
 
         thumb = (info.get("thumbnail") or info.get("thumbnails", [{}])[0].get("url", "")).split("?")[0]
         details = {
@@ -181,23 +217,21 @@ class YouTubeAPI:
     @capture_internal_err
     async def formats(self, link: str, videoid: Union[str, bool, None] = None) -> Tuple[List[Dict], str]:
         link = self._prepare_link(link, videoid)
-        opts = {"quiet": True, "cookiefile": cookies_file}
         formats: List[Dict] = []
         try:
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                info = ydl.extract_info(link, download=False)
-                for fmt in info.get("formats", []):
-                    if "dash" in fmt.get("format", "").lower():
-                        continue
-                    if all(k in fmt for k in ("format", "filesize", "format_id", "ext", "format_note")):
-                        formats.append({
-                            "format": fmt["format"],
-                            "filesize": fmt["filesize"],
-                            "format_id": fmt["format_id"],
-                            "ext": fmt["ext"],
-                            "format_note": fmt["format_note"],
-                            "yturl": link,
-                        })
+            info = await extractor.extract(link, keys=("formats",))
+            for fmt in info.get("formats") or []:
+                if "dash" in fmt.get("format", "").lower():
+                    continue
+                if all(k in fmt for k in ("format", "filesize", "format_id", "ext", "format_note")):
+                    formats.append({
+                        "format": fmt["format"],
+                        "filesize": fmt["filesize"],
+                        "format_id": fmt["format_id"],
+                        "ext": fmt["ext"],
+                        "format_note": fmt["format_note"],
+                        "yturl": link,
+                    })
         except Exception as e:
             print(f"[formats()] yt-dlp error: {e}")
         return formats, link
@@ -206,6 +240,7 @@ class YouTubeAPI:
     async def slider(self, link: str, query_type: int, videoid: Union[str, bool, None] = None) -> Tuple[str, Optional[str], str, str]:
         search = VideosSearch(self._prepare_link(link, videoid), limit=10)
         results = (await search.next()).get("result", [])
+        remember_videos(results)
         if not results or query_type >= len(results):
             raise IndexError(f"Query type index {query_type} out of range (found {len(results)} results)")
         res = results[query_type]
@@ -228,6 +263,7 @@ class YouTubeAPI:
         songvideo: Union[bool, str, None] = None,
         format_id: Union[bool, str, None] = None,
         title: Union[bool, str, None] = None,
+        progressive: bool = True,
     ) -> Union[Tuple[str, Optional[bool]], Tuple[None, None]]:
         link = self._prepare_link(link, videoid)
 
@@ -250,21 +286,11 @@ class YouTubeAPI:
                 path = await download_video_concurrent(link)
                 return (path, True) if path else (None, None)
             else:
-                proc = await asyncio.create_subprocess_exec(
-                    "yt-dlp",
-                    "--cookies",
-                    cookies_file,
-                    "-g",
-                    "-f",
-                    "best[height<=?720][width<=?1280]",
-                    link,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                stdout, _ = await proc.communicate()
-                if stdout:
-                    return stdout.decode().split("\n")[0], None
-                return None, None
-
-        path = await download_audio_concurrent(link)
+                status, stream_url = await self.video(link)
+                return (stream_url, None) if status == 1 else (None, None)
+
+        if progressive and config.PROGRESSIVE_PLAYBACK:
+            path = await download_audio_progressive(link)
+        else:
+            path = await download_audio_concurrent(link)
         return (path, True) if path else (None, None)
@@ -37,7 +37,10 @@ from OpusV.utils.database import (
 from OpusV.utils.decorators.language import languageCB
 from OpusV.utils.formatters import seconds_to_min
 from OpusV.utils.inline import close_markup, stream_markup, stream_markup_timer
+from OpusV.utils.media_store import media_store
 from OpusV.utils.stream.autoclear import auto_clean
+from OpusV.utils.stream.lazy import resolve_upcoming
+from OpusV.utils.stream.prefetch import prefetcher
 from OpusV.utils.thumbnails import get_thumb
 
 
@@ -248,11 +251,15 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
 
     await callback.answer()
 
+    await resolve_upcoming(chat_id, 1)
     if not playlist:
+        if command == "Skip":
+            await Space.stop_stream(chat_id)
         return await callback.answer(_["queue_2"], show_alert=True)
 
     current_track = playlist[0]
     queued = current_track["file"]
+    prefetcher.schedule(chat_id)
     title = current_track["title"].title()
     user = current_track["by"]
     duration = current_track["dur"]
@@ -260,12 +267,7 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
     videoid = current_track["vidid"]
     status = True if str(streamtype) == "video" else None
 
-    db[chat_id][0]["played"] = 0
-    if current_track.get("old_dur"):
-        db[chat_id][0]["dur"] = current_track["old_dur"]
-        db[chat_id][0]["seconds"] = current_track["old_second"]
-        db[chat_id][0]["speed_path"] = None
-        db[chat_id][0]["speed"] = 1.0
+    db[chat_id][0].started()
 
     if "live_" in queued:
         n, new_link = await YouTube.video(videoid, True)
@@ -289,8 +291,7 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
             caption=_["stream_1"].format(f"https://t.me/{app.username}?start=info_{videoid}", title[:23], duration, user),
             reply_markup=InlineKeyboardMarkup(buttons)
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "tg"
+        db[chat_id][0].shown(run, "tg")
         try:
             await callback.edit_message_text(text_msg, reply_markup=close_markup(_))
         except Exception:
@@ -302,6 +303,9 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
             file_path, direct = await YouTube.download(videoid, mystic, videoid=True, video=status)
         except Exception:
             return await mystic.edit_text(_["call_6"])
+        if direct and current_track.get("pinned") != file_path:
+            media_store.pin(file_path)
+            db[chat_id][0]["pinned"] = file_path
         try:
             image = await YouTube.thumbnail(videoid, True)
         except Exception:
@@ -317,8 +321,7 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
             caption=_["stream_1"].format(f"https://t.me/{app.username}?start=info_{videoid}", title[:23], duration, user),
             reply_markup=InlineKeyboardMarkup(buttons)
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "stream"
+        db[chat_id][0].shown(run, "stream")
         try:
             await callback.edit_message_text(text_msg, reply_markup=close_markup(_))
         except Exception:
@@ -336,8 +339,7 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
             caption=_["stream_2"].format(user),
             reply_markup=InlineKeyboardMarkup(buttons)
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "tg"
+        db[chat_id][0].shown(run, "tg")
         try:
             await callback.edit_message_text(text_msg, reply_markup=close_markup(_))
         except Exception:
@@ -362,8 +364,7 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
                 caption=_["stream_1"].format(SUPPORT_CHAT, title[:23], duration, user),
                 reply_markup=InlineKeyboardMarkup(buttons)
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].shown(run, "tg")
         elif videoid == "soundcloud":
             buttons = stream_markup(_, chat_id)
             run = await callback.message.reply_photo(
@@ -371,8 +372,7 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
                 caption=_["stream_1"].format(SUPPORT_CHAT, title[:23], duration, user),
                 reply_markup=InlineKeyboardMarkup(buttons)
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].shown(run, "tg")
         else:
             buttons = stream_markup(_, chat_id)
             img = await get_thumb(videoid)
@@ -381,8 +381,7 @@ async def handle_skip_replay(callback: CallbackQuery, _, chat_id: int, command:
                 caption=_["stream_1"].format(f"https://t.me/{app.username}?start=info_{videoid}", title[:23], duration, user),
                 reply_markup=InlineKeyboardMarkup(buttons)
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            db[chat_id][0].shown(run, "stream")
         try:
             await callback.edit_message_text(text_msg, reply_markup=close_markup(_))
         except Exception:
@@ -438,9 +437,9 @@ async def handle_seek(callback: CallbackQuery, _, chat_id: int, command: str, us
     except Exception:
         return await mystic.edit_text(_["admin_26"])
     if int(command) in [1, 3]:
-        db[chat_id][0]["played"] -= duration_to_skip
+        db[chat_id][0].seeked(-duration_to_skip)
     else:
-        db[chat_id][0]["played"] += duration_to_skip
+        db[chat_id][0].seeked(duration_to_skip)
     seek_message = _["admin_25"].format(seconds_to_min(to_seek))
     await mystic.edit_text(f"{seek_message}\n\nᴄʜᴀɴɢᴇs ᴅᴏɴᴇ ʙʏ : {user_mention} !")
 
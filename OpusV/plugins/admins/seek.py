@@ -66,9 +66,9 @@ async def seek_comm(cli, message: Message, _, chat_id):
     except:
         return await mystic.edit_text(_["admin_26"], reply_markup=close_markup(_))
     if message.command[0][-2] == "c":
-        db[chat_id][0]["played"] -= duration_to_skip
+        db[chat_id][0].seeked(-duration_to_skip)
     else:
-        db[chat_id][0]["played"] += duration_to_skip
+        db[chat_id][0].seeked(duration_to_skip)
     await mystic.edit_text(
         text=_["admin_25"].format(seconds_to_min(to_seek), message.from_user.mention),
         reply_markup=close_markup(_),
@@ -8,7 +8,10 @@ from OpusV.misc import db
 from OpusV.utils.database import get_loop
 from OpusV.utils.decorators import AdminRightsCheck
 from OpusV.utils.inline import close_markup, stream_markup
+from OpusV.utils.media_store import media_store
 from OpusV.utils.stream.autoclear import auto_clean
+from OpusV.utils.stream.lazy import resolve_upcoming
+from OpusV.utils.stream.prefetch import prefetcher
 from OpusV.utils.thumbnails import get_thumb
 from config import BANNED_USERS
 
@@ -89,19 +92,21 @@ async def skip(cli, message: Message, _, chat_id):
                 return await Space.stop_stream(chat_id)
             except:
                 return
+    await resolve_upcoming(chat_id, 1)
+    if not check:
+        await message.reply_text(
+            text=_["admin_6"].format(message.from_user.mention, message.chat.title),
+            reply_markup=close_markup(_),
+        )
+        return await Space.stop_stream(chat_id)
     queued = check[0]["file"]
+    prefetcher.schedule(chat_id)
     title = (check[0]["title"]).title()
     user = check[0]["by"]
     streamtype = check[0]["streamtype"]
     videoid = check[0]["vidid"]
     status = True if str(streamtype) == "video" else None
-    db[chat_id][0]["played"] = 0
-    exis = (check[0]).get("old_dur")
-    if exis:
-        db[chat_id][0]["dur"] = exis
-        db[chat_id][0]["seconds"] = check[0]["old_second"]
-        db[chat_id][0]["speed_path"] = None
-        db[chat_id][0]["speed"] = 1.0
+    db[chat_id][0].started()
     if "live_" in queued:
         n, link = await YouTube.video(videoid, True)
         if n == 0:
@@ -126,8 +131,7 @@ async def skip(cli, message: Message, _, chat_id):
             ),
             reply_markup=InlineKeyboardMarkup(button),
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "tg"
+        db[chat_id][0].shown(run, "tg")
     elif "vid_" in queued:
         mystic = await message.reply_text(_["call_7"], disable_web_page_preview=True)
         try:
@@ -139,6 +143,9 @@ async def skip(cli, message: Message, _, chat_id):
             )
         except:
             return await mystic.edit_text(_["call_6"])
+        if direct and check[0].get("pinned") != file_path:
+            media_store.pin(file_path)
+            db[chat_id][0]["pinned"] = file_path
         try:
             image = await YouTube.thumbnail(videoid, True)
         except:
@@ -159,8 +166,7 @@ async def skip(cli, message: Message, _, chat_id):
             ),
             reply_markup=InlineKeyboardMarkup(button),
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "stream"
+        db[chat_id][0].shown(run, "stream")
         await mystic.delete()
     elif "index_" in queued:
         try:
@@ -173,8 +179,7 @@ async def skip(cli, message: Message, _, chat_id):
             caption=_["stream_2"].format(user),
             reply_markup=InlineKeyboardMarkup(button),
         )
-        db[chat_id][0]["mystic"] = run
-        db[chat_id][0]["markup"] = "tg"
+        db[chat_id][0].shown(run, "tg")
     else:
         if videoid == "telegram":
             image = None
@@ -200,8 +205,7 @@ async def skip(cli, message: Message, _, chat_id):
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].shown(run, "tg")
         elif videoid == "soundcloud":
             button = stream_markup(_, chat_id)
             run = await message.reply_photo(
@@ -213,8 +217,7 @@ async def skip(cli, message: Message, _, chat_id):
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].shown(run, "tg")
         else:
             button = stream_markup(_, chat_id)
             img = await get_thumb(videoid)
@@ -228,5 +231,4 @@ async def skip(cli, message: Message, _, chat_id):
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
\ No newline at end of file
+            db[chat_id][0].shown(run, "stream")
\ No newline at end of file
@@ -20,14 +20,16 @@ from OpusV.utils.database import (
 )
 from OpusV.utils.decorators.language import language
 from OpusV.utils.pastebin import OpusVBin
+from OpusV.utils.stream.snapshot import save_snapshot
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 async def is_heroku():
     return "heroku" in socket.getfqdn()
 
-def cleanup_storage():
-    folders_to_remove = ["downloads", "raw_files", "cache"]
+def cleanup_storage(keep_media: bool = False):
+    # Resumed calls still need their downloads
+    folders_to_remove = ["raw_files", "cache"] if keep_media else ["downloads", "raw_files", "cache"]
     for folder in folders_to_remove:
         try:
             shutil.rmtree(folder)
@@ -45,6 +47,18 @@ def cleanup_storage():
                     pass
 
 
+async def hot_restart() -> bool:
+    """Save live calls for the next process; on success chats are left running instead of being told to replay."""
+    if not config.HOT_RESTART:
+        return False
+    try:
+        await save_snapshot()
+        return True
+    except Exception as e:
+        print(f"[RESTART] Call snapshot failed: {e}")
+        return False
+
+
 @app.on_message(filters.command(["getlog", "logs", "getlogs"]) & SUDOERS)
 @language
 async def log_(client, message, _):
@@ -111,8 +125,9 @@ async def update_(client, message, _):
 
     os.system("git stash &> /dev/null && git pull")
 
+    hot = await hot_restart()
     try:
-        served_chats = await get_active_chats()
+        served_chats = [] if hot else await get_active_chats()
         for x in served_chats:
             try:
                 await app.send_message(chat_id=int(x), text=_["server_8"].format(app.mention))
@@ -124,7 +139,7 @@ async def update_(client, message, _):
     except:
         pass
 
-    cleanup_storage()
+    cleanup_storage(keep_media=hot)
 
     if await is_heroku():
         try:
@@ -145,7 +160,8 @@ async def update_(client, message, _):
 @app.on_message(filters.command(["restart"]) & SUDOERS)
 async def restart_(_, message):
     response = await message.reply_text("ʀᴇsᴛᴀʀᴛɪɴɢ...")
-    ac_chats = await get_active_chats()
+    hot = await hot_restart()
+    ac_chats = [] if hot else await get_active_chats()
     for x in ac_chats:
         try:
             await app.send_message(
@@ -157,7 +173,7 @@ async def restart_(_, message):
         except:
             pass
 
-    cleanup_storage()
+    cleanup_storage(keep_media=hot)
 
     await response.edit_text(
         "» ʀᴇsᴛᴀʀᴛ ᴘʀᴏᴄᴇss sᴛᴀʀᴛᴇᴅ, ᴘʟᴇᴀsᴇ ᴡᴀɪᴛ ғᴏʀ ғᴇᴡ sᴇᴄᴏɴᴅs ᴜɴᴛɪʟ ᴛʜᴇ ʙᴏᴛ sᴛᴀʀᴛs..."
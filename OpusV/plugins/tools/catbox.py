@@ -1,26 +1,25 @@
 import os
-import httpx
 import asyncio
 
 from pyrogram import filters
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Message
 
 from OpusV import app
+from OpusV.utils import http_client
 
 
 async def upload_catbox(path: str):
-    """Upload file to Catbox.moe with retry logic using httpx."""
+    """Upload file to Catbox.moe with retry logic using the shared HTTP client."""
     url = "https://catbox.moe/user/api.php"
 
     for attempt in range(3):
         try:
-            async with httpx.AsyncClient(timeout=120) as client:
-                with open(path, "rb") as f:
-                    files = {"fileToUpload": (os.path.basename(path), f)}
-                    data = {"reqtype": "fileupload"}
-                    resp = await client.post(url, data=data, files=files)
-                    if resp.status_code == 200 and "catbox.moe" in resp.text:
-                        return True, resp.text.strip()
+            with open(path, "rb") as f:
+                files = {"fileToUpload": (os.path.basename(path), f)}
+                data = {"reqtype": "fileupload"}
+                resp = await http_client.post(url, data=data, files=files, timeout=120)
+                if resp.status_code == 200 and "catbox.moe" in resp.text:
+                    return True, resp.text.strip()
             await asyncio.sleep(1)
         except Exception as e:
             last_error = str(e)
@@ -30,18 +29,17 @@ async def upload_catbox(path: str):
 
 
 async def upload_anonfiles(path: str):
-    """Upload file to AnonFiles as fallback using httpx."""
+    """Upload file to AnonFiles as fallback using the shared HTTP client."""
     url = "https://api.anonfiles.com/upload"
     try:
-        async with httpx.AsyncClient(timeout=180) as client:
-            with open(path, "rb") as f:
-                files = {"file": (os.path.basename(path), f)}
-                resp = await client.post(url, files=files)
-                data = resp.json()
-                if data.get("status"):
-                    file_url = data["data"]["file"]["url"]["full"]
-                    return True, file_url
-                return False, data.get("error", {}).get("message", "AnonFiles upload failed.")
+        with open(path, "rb") as f:
+            files = {"file": (os.path.basename(path), f)}
+            resp = await http_client.post(url, files=files, timeout=180)
+            data = resp.json()
+            if data.get("status"):
+                file_url = data["data"]["file"]["url"]["full"]
+                return True, file_url
+            return False, data.get("error", {}).get("message", "AnonFiles upload failed.")
     except Exception as e:
         return False, str(e)
 
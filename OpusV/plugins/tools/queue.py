@@ -12,9 +12,11 @@ from OpusV.utils import OpusVBin, get_channeplayCB, seconds_to_min
 from OpusV.utils.database import get_cmode, is_active_chat, is_music_playing
 from OpusV.utils.decorators.language import language, languageCB
 from OpusV.utils.inline import queue_back_markup, queue_markup
+from OpusV.utils.stream.lazy import resolve_upcoming
 from config import BANNED_USERS
 
 basic = {}
+QUEUE_PREVIEW = 10  # lazy entries looked up before rendering the queue
 
 
 def get_image(videoid):
@@ -160,6 +162,8 @@ async def queued_tracks(client, CallbackQuery: CallbackQuery, _):
         caption=_["queue_1"],
     )
     await CallbackQuery.edit_message_media(media=med)
+    await resolve_upcoming(chat_id, QUEUE_PREVIEW)
+    got = db.get(chat_id) or []
     j = 0
     msg = ""
     for x in got:
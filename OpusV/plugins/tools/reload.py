@@ -11,6 +11,7 @@ from OpusV.misc import db
 from OpusV.utils.database import get_assistant, get_authuser_names, get_cmode
 from OpusV.utils.decorators import ActualAdminCB, AdminActual, language
 from OpusV.utils.formatters import alpha_to_int, get_readable_time
+from OpusV.utils.stream.state import ChatQueue
 from config import BANNED_USERS, adminlist, lyrical
 
 rel = {}
@@ -54,7 +55,7 @@ async def restartbot(client, message: Message, _):
     
     try:
         # Clear main chat database
-        db[message.chat.id] = []
+        db[message.chat.id] = ChatQueue()
         
         # Stop stream with enhanced call system
         await Space.stop_stream(message.chat.id)
@@ -86,7 +87,7 @@ async def restartbot(client, message: Message, _):
             got = await app.get_chat(chat_id)
             
             # Clear channel mode database
-            db[chat_id] = []
+            db[chat_id] = ChatQueue()
             
             # Stop channel mode stream
             await Space.stop_stream(chat_id)
@@ -18,6 +18,7 @@ from pyrogram.types import (
 )
 
 from OpusV import app
+from OpusV.utils import http_client
 from config import (
     BANNED_USERS,
     SONG_DOWNLOAD_DURATION,
@@ -77,11 +78,10 @@ async def song_command_private(client, message: Message, lang):
 
     # Use Billa API search endpoint
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.get(f"{BILLA_API_BASE}/search_track/{httpx.utils.quote(query)}")
-            if resp.status_code != 200:
-                return await mystic.edit_text(lang["play_3"])
-            data = resp.json()
+        resp = await http_client.get(f"{BILLA_API_BASE}/search_track/{httpx.utils.quote(query)}", timeout=30)
+        if resp.status_code != 200:
+            return await mystic.edit_text(lang["play_3"])
+        data = resp.json()
     except Exception:
         return await mystic.edit_text(lang["play_3"])
 
@@ -189,13 +189,12 @@ async def song_download_cb(client, cq, lang):
             # Download the cover/thumb to pass to sent audio (and to compute width/height if needed)
             try:
                 if cover:
-                    async with httpx.AsyncClient(timeout=30) as client:
-                        rcover = await client.get(cover)
-                        if rcover.status_code == 200:
-                            tf = tempfile.NamedTemporaryFile(delete=False, suffix=".jpg")
-                            tf.write(rcover.content)
-                            tf.flush()
-                            thumb_path = tf.name
+                    rcover = await http_client.get(cover, timeout=30)
+                    if rcover.status_code == 200:
+                        tf = tempfile.NamedTemporaryFile(delete=False, suffix=".jpg")
+                        tf.write(rcover.content)
+                        tf.flush()
+                        thumb_path = tf.name
             except Exception:
                 thumb_path = None
 
@@ -215,16 +214,15 @@ async def song_download_cb(client, cq, lang):
             os.close(tmpfd)
             file_path = tmpfname
 
-            # Stream with httpx to file
-            async with httpx.AsyncClient(timeout=600) as client:
-                async with client.stream("GET", download_url_hint) as resp:
-                    if resp.status_code != 200:
-                        # Try one more: maybe API expects URL-encoded param differently
-                        return await mystic.edit_text(lang["song_10"])
-                    with open(file_path, "wb") as f:
-                        async for chunk in resp.aiter_bytes(chunk_size=65536):
-                            if chunk:
-                                f.write(chunk)
+            # Stream with the shared client to file
+            async with http_client.stream("GET", download_url_hint, timeout=600) as resp:
+                if resp.status_code != 200:
+                    # Try one more: maybe API expects URL-encoded param differently
+                    return await mystic.edit_text(lang["song_10"])
+                with open(file_path, "wb") as f:
+                    async for chunk in resp.aiter_bytes(chunk_size=65536):
+                        if chunk:
+                            f.write(chunk)
 
             if not file_path or not os.path.exists(file_path):
                 return await mystic.edit_text(lang["song_10"])
@@ -7,10 +7,35 @@ from OpusV.core.call import Space
 from OpusV.utils.admin_filters import admin_filter
 from OpusV.utils.database import group_assistant
 from OpusV import app
+from OpusV.utils.scheduler import scheduler
 
 VC_CACHE = {}
 VC_TRACKING_ENABLED = set()
 VC_MONITOR_TASKS = {}
+VC_POLL_INTERVAL = 5
+VC_NOTICE_TTL = 30
+
+
+async def _notify(chat_id: int, text: str):
+    """Post a VC notice and let the scheduler delete it after ``VC_NOTICE_TTL`` seconds."""
+    try:
+        msg = await app.send_message(chat_id, text)
+    except FloodWait as fw:
+        await asyncio.sleep(fw.value)
+        try:
+            msg = await app.send_message(chat_id, text)
+        except Exception:
+            return
+    except Exception:
+        return
+    scheduler.call_later(VC_NOTICE_TTL, msg.delete)
+
+
+def _stop_monitor(chat_id: int):
+    task = VC_MONITOR_TASKS.pop(chat_id, None)
+    if task is not None:
+        task.cancel()
+
 
 async def monitor_vc_changes(chat_id: int):
     """Background task to monitor voice chat changes."""
@@ -46,65 +71,61 @@ async def monitor_vc_changes(chat_id: int):
             if joined_lines:
                 result = "\n\n".join(joined_lines)
                 result += f"\n\n👥 <b>Now in VC:</b> {len(participants)}"
-                try:
-                    msg = await app.send_message(chat_id, result)
-                    await asyncio.sleep(30)
-                    await msg.delete()
-                except Exception:
-                    pass
+                await _notify(chat_id, result)
 
         VC_CACHE[chat_id] = current_ids
+        if chat_id in VC_TRACKING_ENABLED:
+            VC_MONITOR_TASKS[chat_id] = scheduler.every(
+                VC_POLL_INTERVAL, poll_vc_changes, chat_id, key=("vcmonitor", chat_id)
+            )
+    except Exception as e:
+        try:
+            await app.send_message(chat_id, f"❌ VC monitoring stopped due to error: {e}")
+        except Exception:
+            pass
+        VC_TRACKING_ENABLED.discard(chat_id)
+        VC_CACHE.pop(chat_id, None)
+        _stop_monitor(chat_id)
 
-        # Begin monitoring loop
-        while chat_id in VC_TRACKING_ENABLED:
-            await asyncio.sleep(5)
-
-            assistant = await group_assistant(Space, chat_id)
-            if not assistant:
-                raise Exception("Assistant not found or not initialized.")
-            try:
-                participants = await assistant.get_participants(chat_id)
-            except Exception as e:
-                raise Exception(f"Could not fetch participants: {e}")
-
-            current_ids = set(p.user_id for p in participants)
-            old_ids = VC_CACHE.get(chat_id, set())
-            VC_CACHE[chat_id] = current_ids
 
-            joined_lines = []
-            left_lines = []
+async def poll_vc_changes(chat_id: int):
+    """One scheduled check of who joined or left since the last poll."""
+    try:
+        assistant = await group_assistant(Space, chat_id)
+        if not assistant:
+            raise Exception("Assistant not found or not initialized.")
+        try:
+            participants = await assistant.get_participants(chat_id)
+        except Exception as e:
+            raise Exception(f"Could not fetch participants: {e}")
 
-            for user_id in current_ids - old_ids:
-                try:
-                    user = await app.get_users(user_id)
-                    name = user.mention if user else f"<code>{user_id}</code>"
-                except Exception:
-                    name = f"<code>{user_id}</code>"
-                joined_lines.append(f"#JoinedVC\n<b>Name:</b> {name}")
+        current_ids = set(p.user_id for p in participants)
+        old_ids = VC_CACHE.get(chat_id, set())
+        VC_CACHE[chat_id] = current_ids
 
-            for user_id in old_ids - current_ids:
-                try:
-                    user = await app.get_users(user_id)
-                    name = user.mention if user else f"<code>{user_id}</code>"
-                except Exception:
-                    name = f"<code>{user_id}</code>"
-                left_lines.append(f"#LeftVC\n<b>Name:</b> {name}")
+        joined_lines = []
+        left_lines = []
 
-            if joined_lines or left_lines:
-                result = "\n\n".join(joined_lines + left_lines)
-                result += f"\n\n👥 <b>Now in VC:</b> {len(current_ids)}"
-                try:
-                    msg = await app.send_message(chat_id, result)
-                    await asyncio.sleep(30)
-                    await msg.delete()
-                except FloodWait as fw:
-                    await asyncio.sleep(fw.value)
-                    msg = await app.send_message(chat_id, result)
-                    await asyncio.sleep(30)
-                    await msg.delete()
-                except Exception:
-                    pass
+        for user_id in current_ids - old_ids:
+            try:
+                user = await app.get_users(user_id)
+                name = user.mention if user else f"<code>{user_id}</code>"
+            except Exception:
+                name = f"<code>{user_id}</code>"
+            joined_lines.append(f"#JoinedVC\n<b>Name:</b> {name}")
 
+        for user_id in old_ids - current_ids:
+            try:
+                user = await app.get_users(user_id)
+                name = user.mention if user else f"<code>{user_id}</code>"
+            except Exception:
+                name = f"<code>{user_id}</code>"
+            left_lines.append(f"#LeftVC\n<b>Name:</b> {name}")
+
+        if joined_lines or left_lines:
+            result = "\n\n".join(joined_lines + left_lines)
+            result += f"\n\n👥 <b>Now in VC:</b> {len(current_ids)}"
+            await _notify(chat_id, result)
     except Exception as e:
         try:
             await app.send_message(chat_id, f"❌ VC monitoring stopped due to error: {e}")
@@ -112,7 +133,7 @@ async def monitor_vc_changes(chat_id: int):
             pass
         VC_TRACKING_ENABLED.discard(chat_id)
         VC_CACHE.pop(chat_id, None)
-        VC_MONITOR_TASKS.pop(chat_id, None)
+        _stop_monitor(chat_id)
 
 
 @app.on_message(filters.command(["vcinfo", "infovc", "vclogger"]) & filters.group & admin_filter & ~BANNED_USERS)
@@ -132,9 +153,7 @@ async def vc_info(client: Client, message: Message):
         if chat_id in VC_TRACKING_ENABLED:
             VC_TRACKING_ENABLED.discard(chat_id)
             VC_CACHE.pop(chat_id, None)
-            if chat_id in VC_MONITOR_TASKS:
-                VC_MONITOR_TASKS[chat_id].cancel()
-                VC_MONITOR_TASKS.pop(chat_id, None)
+            _stop_monitor(chat_id)
             return await message.reply_text("❌ VC tracking disabled and cache cleared.")
         return await message.reply_text("❌ VC tracking is already disabled.")
 
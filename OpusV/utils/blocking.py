@@ -0,0 +1,96 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from yt_dlp.utils import DownloadCancelled
+
+import config
+from OpusV.logging import LOGGER
+
+blocking_executor = ThreadPoolExecutor(
+    max_workers=config.BLOCKING_WORKERS, thread_name_prefix="blocking"
+)
+
+
+def cancel_hook(cancel: threading.Event) -> Callable:
+    """yt-dlp progress hook that aborts the download once ``cancel`` is set."""
+    def hook(_):
+        if cancel.is_set():
+            raise DownloadCancelled()
+    return hook
+
+
+async def run_blocking(
+    func: Callable,
+    *args,
+    timeout: Optional[float] = None,
+    cancel: Optional[threading.Event] = None,
+):
+    """
+    Run ``func`` on the bounded blocking pool. On timeout or task cancellation
+    ``cancel`` is set so a cooperating worker (e.g. via ``cancel_hook``) stops early.
+    """
+    future = asyncio.get_running_loop().run_in_executor(blocking_executor, func, *args)
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except (asyncio.CancelledError, asyncio.TimeoutError):
+        if cancel is not None:
+            cancel.set()
+        raise
+
+
+class LoopWatchdog:
+    """
+    Debug aid: a heartbeat coroutine ticks on the event loop while a daemon
+    thread watches it. When a tick is late by more than ``threshold_ms`` the
+    loop thread's current stack is logged once for that stall.
+    """
+
+    def __init__(self, threshold_ms: int):
+        self.threshold = threshold_ms / 1000
+        self.interval = max(self.threshold / 2, 0.01)
+        self._last = time.monotonic()
+        self._beats = 0
+        self._reported = -1
+        self._ident: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._ident = threading.get_ident()
+        self._last = time.monotonic()
+        self._task = asyncio.ensure_future(self._beat())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+        LOGGER(__name__).info(f"Loop watchdog reporting stalls over {int(self.threshold * 1000)} ms")
+
+    async def _beat(self) -> None:
+        while True:
+            self._last = time.monotonic()
+            self._beats += 1
+            await asyncio.sleep(self.interval)
+
+    def _watch(self) -> None:
+        while self._task is not None and not self._task.done():
+            time.sleep(self.interval)
+            lag = time.monotonic() - self._last - self.interval
+            if lag < self.threshold or self._reported == self._beats:
+                continue
+            self._reported = self._beats
+            frame = sys._current_frames().get(self._ident)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<no frame>"
+            LOGGER(__name__).warning(
+                f"Event loop blocked for {int(lag * 1000)} ms, loop thread is at:\n{stack}"
+            )
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+loop_watchdog = LoopWatchdog(config.LOOP_BLOCK_THRESHOLD_MS)
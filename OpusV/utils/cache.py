@@ -0,0 +1,136 @@
+import asyncio
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from OpusV.logging import LOGGER
+
+MISSING = object()
+
+
+def normalize_key(text: str) -> str:
+    """Fold case, unicode compatibility forms and whitespace so equivalent queries share a key."""
+    return " ".join(unicodedata.normalize("NFKC", str(text)).casefold().split())
+
+
+class TieredCache:
+    """
+    Bounded in-memory LRU with per-entry TTL, optionally backed by a Mongo
+    collection so entries survive restarts. ``None`` values are cached as
+    negative entries for ``negative_ttl`` seconds. ``get`` returns ``MISSING``
+    when nothing usable is cached.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        ttl: int,
+        collection=None,
+        negative_ttl: Optional[int] = None,
+    ):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.collection = collection
+        self._mem: "OrderedDict[str, tuple]" = OrderedDict()
+        self._index_ready = False
+        self._tasks = set()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, value: Any, expires: float) -> None:
+        self._mem[key] = (expires, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+
+    def peek(self, key: str) -> Any:
+        """Memory-only lookup, safe to call from synchronous code."""
+        item = self._mem.get(key)
+        if item is None:
+            return MISSING
+        if item[0] < time.time():
+            self._mem.pop(key, None)
+            return MISSING
+        self._mem.move_to_end(key)
+        return item[1]
+
+    async def get(self, key: str) -> Any:
+        value = self.peek(key)
+        if value is not MISSING:
+            self.hits += 1
+            return value
+        if self.collection is not None:
+            try:
+                doc = await self.collection.find_one({"_id": key})
+            except Exception as e:
+                LOGGER(__name__).warning(f"{self.name} cache read failed: {e}")
+                doc = None
+            if doc and doc.get("expires") and doc["expires"] > datetime.utcnow():
+                expires = time.time() + (doc["expires"] - datetime.utcnow()).total_seconds()
+                self._remember(key, doc.get("value"), expires)
+                self.persistent_hits += 1
+                return doc.get("value")
+        self.misses += 1
+        return MISSING
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Batch ``get``: one Mongo query for everything missing from memory. Misses are left out."""
+        found: Dict[str, Any] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            value = self.peek(key)
+            if value is MISSING:
+                missing.append(key)
+            else:
+                self.hits += 1
+                found[key] = value
+        if missing and self.collection is not None:
+            now = datetime.utcnow()
+            try:
+                async for doc in self.collection.find({"_id": {"$in": missing}, "expires": {"$gt": now}}):
+                    expires = time.time() + (doc["expires"] - now).total_seconds()
+                    self._remember(doc["_id"], doc.get("value"), expires)
+                    found[doc["_id"]] = doc.get("value")
+                    self.persistent_hits += 1
+            except Exception as e:
+                LOGGER(__name__).warning(f"{self.name} cache read failed: {e}")
+        self.misses += sum(1 for key in missing if key not in found)
+        return found
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, persist: bool = True) -> None:
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+        if not ttl:
+            return
+        self._remember(key, value, time.time() + ttl)
+        if persist and self.collection is not None:
+            task = asyncio.ensure_future(self._persist(key, value, ttl))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _persist(self, key: str, value: Any, ttl: int) -> None:
+        try:
+            if not self._index_ready:
+                await self.collection.create_index("expires", expireAfterSeconds=0)
+                self._index_ready = True
+            await self.collection.update_one(
+                {"_id": key},
+                {"$set": {"value": value, "expires": datetime.utcnow() + timedelta(seconds=ttl)}},
+                upsert=True,
+            )
+        except Exception as e:
+            LOGGER(__name__).warning(f"{self.name} cache write failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._mem),
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+        }
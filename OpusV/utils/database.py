@@ -1,9 +1,11 @@
 import asyncio
 from datetime import datetime, timedelta
-import random
 from typing import Dict, List, Union
 from OpusV import userbot
 from OpusV.core.mongo import mongodb
+from OpusV.utils.placement import placement
+from OpusV.utils.registry import ChatRegistry
+from OpusV.utils.scheduler import scheduler
 
 authdb = mongodb.adminauth
 authuserdb = mongodb.authuser
@@ -24,9 +26,19 @@ sudoersdb = mongodb.sudoers
 usersdb = mongodb.tgusersdb
 suggdb = mongodb.suggestion
 
-active = []
-activevideo = []
+active = ChatRegistry("active")
+activevideo = ChatRegistry("activevideo")
 assistantdict = {}
+
+# Keep per-assistant call counts in step with the live call registries
+active.subscribe(
+    lambda chat_id, added: placement.attach(chat_id, assistantdict.get(chat_id))
+    if added
+    else placement.detach(chat_id)
+)
+activevideo.subscribe(
+    lambda chat_id, added: placement.video_on(chat_id) if added else placement.video_off(chat_id)
+)
 autoend = {}
 count = {}
 channelconnect = {}
@@ -50,16 +62,7 @@ async def get_assistant_number(chat_id: int) -> str:
 
 
 async def get_client(assistant: int):
-    if int(assistant) == 1:
-        return userbot.one
-    elif int(assistant) == 2:
-        return userbot.two
-    elif int(assistant) == 3:
-        return userbot.three
-    elif int(assistant) == 4:
-        return userbot.four
-    elif int(assistant) == 5:
-        return userbot.five
+    return userbot.clients.get(int(assistant))
 
 
 async def set_assistant_new(chat_id, number):
@@ -74,7 +77,7 @@ async def set_assistant_new(chat_id, number):
 async def set_assistant(chat_id):
     from OpusV.core.userbot import assistants
 
-    ran_assistant = random.choice(assistants)
+    ran_assistant = placement.choose(assistants)
     assistantdict[chat_id] = ran_assistant
     await assdb.update_one(
         {"chat_id": chat_id},
@@ -85,6 +88,11 @@ async def set_assistant(chat_id):
     return userbot
 
 
+def _keeps_assistant(chat_id: int, assistant: int, assistants: list) -> bool:
+    # An idle chat moves off an assistant that is cooling down; a live one stays put
+    return assistant in assistants and (chat_id in active or placement.healthy(assistant))
+
+
 async def get_assistant(chat_id: int) -> str:
     from OpusV.core.userbot import assistants
 
@@ -96,7 +104,7 @@ async def get_assistant(chat_id: int) -> str:
             return userbot
         else:
             got_assis = dbassistant["assistant"]
-            if got_assis in assistants:
+            if _keeps_assistant(chat_id, got_assis, assistants):
                 assistantdict[chat_id] = got_assis
                 userbot = await get_client(got_assis)
                 return userbot
@@ -104,7 +112,7 @@ async def get_assistant(chat_id: int) -> str:
                 userbot = await set_assistant(chat_id)
                 return userbot
     else:
-        if assistant in assistants:
+        if _keeps_assistant(chat_id, assistant, assistants):
             userbot = await get_client(assistant)
             return userbot
         else:
@@ -115,7 +123,7 @@ async def get_assistant(chat_id: int) -> str:
 async def set_calls_assistant(chat_id):
     from OpusV.core.userbot import assistants
 
-    ran_assistant = random.choice(assistants)
+    ran_assistant = placement.choose(assistants)
     assistantdict[chat_id] = ran_assistant
     await assdb.update_one(
         {"chat_id": chat_id},
@@ -145,16 +153,7 @@ async def group_assistant(self, chat_id: int) -> int:
             assis = assistant
         else:
             assis = await set_calls_assistant(chat_id)
-    if int(assis) == 1:
-        return self.one
-    elif int(assis) == 2:
-        return self.two
-    elif int(assis) == 3:
-        return self.three
-    elif int(assis) == 4:
-        return self.four
-    elif int(assis) == 5:
-        return self.five
+    return self.calls.get(int(assis))
 
 
 async def is_skipmode(chat_id: int) -> bool:
@@ -332,45 +331,35 @@ async def mute_off(chat_id: int):
     mute[chat_id] = False
 
 async def get_active_chats() -> list:
-    return active
+    return active.snapshot()
 
 
 async def is_active_chat(chat_id: int) -> bool:
-    if chat_id not in active:
-        return False
-    else:
-        return True
+    return chat_id in active
 
 
 async def add_active_chat(chat_id: int):
-    if chat_id not in active:
-        active.append(chat_id)
+    active.add(chat_id)
 
 
 async def remove_active_chat(chat_id: int):
-    if chat_id in active:
-        active.remove(chat_id)
+    active.discard(chat_id)
 
 
 async def get_active_video_chats() -> list:
-    return activevideo
+    return activevideo.snapshot()
 
 
 async def is_active_video_chat(chat_id: int) -> bool:
-    if chat_id not in activevideo:
-        return False
-    else:
-        return True
+    return chat_id in activevideo
 
 
 async def add_active_video_chat(chat_id: int):
-    if chat_id not in activevideo:
-        activevideo.append(chat_id)
+    activevideo.add(chat_id)
 
 
 async def remove_active_video_chat(chat_id: int):
-    if chat_id in activevideo:
-        activevideo.remove(chat_id)
+    activevideo.discard(chat_id)
 
 
 async def check_nonadmin_chat(chat_id: int) -> bool:
@@ -703,8 +692,7 @@ async def block_user(user_id: int, seconds: int = 600):
     """
     unblock_time = datetime.utcnow() + timedelta(seconds=seconds)
     BLOCKED_USERS[user_id] = unblock_time
-    await asyncio.sleep(seconds)
-    BLOCKED_USERS.pop(user_id, None)
+    scheduler.call_later(seconds, BLOCKED_USERS.pop, user_id, None, key=("unblock", user_id))
 
 
 async def is_user_blocked(user_id: int) -> bool:
@@ -1,13 +1,22 @@
 import asyncio
-import httpx
 import aiofiles
 import os
 import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
 from typing import Optional, Dict, Union, List
 from yt_dlp import YoutubeDL
 
+import config
+
+from OpusV.utils import http_client
+from OpusV.utils.blocking import cancel_hook
+from OpusV.utils.media_store import WORKDIR_PREFIX, download_folder, media_store
+
 cookies_file = "OpusV/resources/cookies.txt"
-download_folder = "downloads"
 os.makedirs(download_folder, exist_ok=True)
 
 
@@ -22,21 +31,44 @@ def safe_filename(name: str) -> str:
 
 
 def file_exists(video_id: str, file_type: str = "audio") -> Optional[str]:
-    extensions = ["mp3"] if file_type == "audio" else ["mp4", "mkv", "webm"]
+    return media_store.get(video_id, file_type)
 
-    for ext in extensions:
-        path = f"{download_folder}/{video_id}.{ext}"
-        if os.path.exists(path):
-            return path
 
-        for file in os.listdir(download_folder):
-            if file.startswith(video_id) and file.endswith(f".{ext}"):
-                return f"{download_folder}/{file}"
+class PartialDownload:
+    """An API download still being written to ``part``; readers can follow it as it grows."""
 
-    return None
+    def __init__(self, path: str, part: str):
+        self.path = path
+        self.part = part
+        self.size = 0
+        self.done = False
+        self.ok = False
+        self._changed = asyncio.Event()
+
+    def grow(self, count: int) -> None:
+        self.size += count
+        self._changed.set()
+        self._changed = asyncio.Event()
 
+    def finish(self, ok: bool) -> None:
+        self.done = True
+        self.ok = ok
+        self._changed.set()
 
-async def api_download(link: str, file_type: str = "audio") -> Optional[str]:
+    async def wait(self, timeout: float) -> None:
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+partials: Dict[str, PartialDownload] = {}
+
+
+async def api_download(
+    link: str, file_type: str = "audio", first_bytes: Optional[asyncio.Event] = None
+) -> Optional[str]:
     if "youtube.com" not in link and "youtu.be" not in link:
         video_id = extract_video_id(link)
         link = f"https://www.youtube.com/watch?v={video_id}"
@@ -57,105 +89,148 @@ async def api_download(link: str, file_type: str = "audio") -> Optional[str]:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=60, follow_redirects=True, headers=headers) as client:
-            # Pick API based on type
-            if file_type == "audio":
-                api_url = f"https://alphaytapi.vercel.app/api/dl?url={link}"
-                resp = await client.get(api_url, follow_redirects=True)
-                if resp.status_code != 200:
-                    print(f"[API ERROR] Audio API failed ({resp.status_code}): {resp.text}")
-                    return None
-                data = resp.json()
-                download_url = data.get("link")
-                if not download_url:
-                    print("[API ERROR] Audio API: missing 'link' in response")
-                    return None
-                ext = "mp3"
-            else:
-                api_url = f"https://apex.srvopus.workers.dev/arytmp?direct&id={video_id}&format=mp4"
-                resp = await client.get(api_url, follow_redirects=True)
-                if resp.status_code != 200:
-                    print(f"[API ERROR] Video API failed ({resp.status_code}): {resp.text}")
-                    return None
-                data = resp.json()
-                if data.get("status") != "success":
-                    print(f"[API ERROR] Video API: non-success response {data}")
-                    return None
-                download_url = data.get("download_url")
-                if not download_url:
-                    print("[API ERROR] Video API: missing 'download_url' in response")
-                    return None
-                ext = "mp4"
-
-            path = f"{download_folder}/{video_id}.{ext}"
+        # Pick API based on type
+        if file_type == "audio":
+            api_url = f"https://alphaytapi.vercel.app/api/dl?url={link}"
+            resp = await http_client.get(api_url, headers=headers, timeout=60)
+            if resp.status_code != 200:
+                print(f"[API ERROR] Audio API failed ({resp.status_code}): {resp.text}")
+                return None
+            data = resp.json()
+            download_url = data.get("link")
+            if not download_url:
+                print("[API ERROR] Audio API: missing 'link' in response")
+                return None
+            ext = "mp3"
+        else:
+            api_url = f"https://apex.srvopus.workers.dev/arytmp?direct&id={video_id}&format=mp4"
+            resp = await http_client.get(api_url, headers=headers, timeout=60)
+            if resp.status_code != 200:
+                print(f"[API ERROR] Video API failed ({resp.status_code}): {resp.text}")
+                return None
+            data = resp.json()
+            if data.get("status") != "success":
+                print(f"[API ERROR] Video API: non-success response {data}")
+                return None
+            download_url = data.get("download_url")
+            if not download_url:
+                print("[API ERROR] Video API: missing 'download_url' in response")
+                return None
+            ext = "mp4"
 
+        path = f"{download_folder}/{video_id}.{ext}"
+        # Write to a partial file so a racing yt-dlp run never sees a truncated output
+        part = f"{path}.part"
+        key = media_store.key(video_id, file_type)
+        partial = partials[key] = PartialDownload(path, part)
+        media_store.expect(path)
+        ok = False
+
+        try:
             try:
-                # Streamed download with redirect support
-                async with client.stream("GET", download_url, headers=headers, follow_redirects=True) as file_resp:
+                try:
+                    # Streamed download with redirect support
+                    async with http_client.stream("GET", download_url, headers=headers, timeout=60) as file_resp:
+                        if file_resp.status_code != 200:
+                            print(f"[API ERROR] Stream failed ({file_resp.status_code}): {file_resp.text}")
+                            return None
+                        async with aiofiles.open(part, "wb") as f:
+                            async for chunk in file_resp.aiter_bytes(chunk_size=8192):
+                                await f.write(chunk)
+                                partial.grow(len(chunk))
+                                if first_bytes:
+                                    first_bytes.set()
+                except Exception:
+                    # Fallback: direct GET with redirect follow
+                    file_resp = await http_client.get(download_url, headers=headers, timeout=60)
                     if file_resp.status_code != 200:
-                        print(f"[API ERROR] Stream failed ({file_resp.status_code}): {file_resp.text}")
+                        print(f"[API ERROR] Fallback full download failed ({file_resp.status_code}): {file_resp.text}")
                         return None
-                    async with aiofiles.open(path, "wb") as f:
-                        async for chunk in file_resp.aiter_bytes(chunk_size=8192):
-                            await f.write(chunk)
-            except Exception:
-                # Fallback: direct GET with redirect follow
-                file_resp = await client.get(download_url, headers=headers, follow_redirects=True)
-                if file_resp.status_code != 200:
-                    print(f"[API ERROR] Fallback full download failed ({file_resp.status_code}): {file_resp.text}")
-                    return None
-                async with aiofiles.open(path, "wb") as f:
-                    await f.write(file_resp.content)
+                    async with aiofiles.open(part, "wb") as f:
+                        await f.write(file_resp.content)
+            except asyncio.CancelledError:
+                if os.path.exists(part):
+                    os.remove(part)
+                raise
 
             # Validate output file
-            if not os.path.exists(path) or os.path.getsize(path) < 1024 * 100:
-                if os.path.exists(path):
-                    os.remove(path)
+            if not os.path.exists(part) or os.path.getsize(part) < 1024 * 100:
+                if os.path.exists(part):
+                    os.remove(part)
                 print(f"[API ERROR] Invalid or too small file: {path}")
                 return None
 
+            os.replace(part, path)
+            media_store.add(video_id, file_type, path)
+            ok = True
             return path
+        finally:
+            partial.finish(ok)
+            if partials.get(key) is partial:
+                del partials[key]
+            media_store.forget(path)
 
     except Exception as e:
         print(f"[API ERROR] Exception: {str(e)}")
         return None
 
 
-def _download_ytdlp(link: str, opts: Dict) -> Union[None, str, List[str]]:
+def _downloaded_path(info: Dict, ext: str, folder: str) -> Optional[str]:
+    for item in info.get("requested_downloads") or []:
+        path = item.get("filepath")
+        if path and os.path.exists(path):
+            return path
+    expected_filename = f"{folder}/{info.get('id')}.{ext}"
+    if os.path.exists(expected_filename):
+        return expected_filename
+    return None
+
+
+def _publish(path: str) -> str:
+    """Move a finished yt-dlp output into the shared folder unless another backend already put the file there."""
+    target = f"{download_folder}/{os.path.basename(path)}"
     try:
+        # Hard links fail instead of overwriting, so a file the API already landed is never replaced
+        os.link(path, target)
+    except FileExistsError:
+        pass
+    except OSError:
+        if not os.path.exists(target):
+            os.replace(path, target)
+    return target
+
+
+def _download_ytdlp(link: str, opts: Dict, cancel: threading.Event) -> Union[None, str, List[str]]:
+    # Each run writes (and post-processes) in its own directory; only finished files are published
+    workdir = tempfile.mkdtemp(prefix=WORKDIR_PREFIX, dir=download_folder)
+    opts = {**opts, "outtmpl": f"{workdir}/%(id)s.%(ext)s"}
+    try:
+        ext = "mp3" if "postprocessors" in opts else "mp4"
         with YoutubeDL(opts) as ydl:
-            info = ydl.extract_info(link, download=False)
+            info = ydl.extract_info(link, download=True)
+            if cancel.is_set():
+                return None
             if "entries" in info:
                 results = []
-                ydl.download([link])
                 for entry in info["entries"]:
-                    vid = entry.get("id")
-                    if not vid:
+                    if not entry or not entry.get("id"):
                         continue
-                    for file in os.listdir(download_folder):
-                        if file.startswith(vid):
-                            results.append(f"{download_folder}/{file}")
+                    path = _downloaded_path(entry, ext, workdir)
+                    if path:
+                        results.append(_publish(path))
                 return results
 
-            vid = info.get("id")
-            ext = "mp3" if "postprocessors" in opts else "mp4"
-            expected_filename = f"{download_folder}/{vid}.{ext}"
-            ydl.download([link])
-
-            if os.path.exists(expected_filename):
-                return expected_filename
-
-            for file in os.listdir(download_folder):
-                if file.startswith(vid):
-                    return f"{download_folder}/{file}"
-
-            return None
+            path = _downloaded_path(info, ext, workdir)
+            return _publish(path) if path else None
     except Exception:
         return None
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
 
 
 async def yt_dlp_download(link: str, type: str, format_id: str = None) -> Union[None, str, List[str]]:
     loop = asyncio.get_running_loop()
+    cancel = threading.Event()
 
     def is_restricted() -> bool:
         return os.path.exists(cookies_file)
@@ -167,6 +242,7 @@ async def yt_dlp_download(link: str, type: str, format_id: str = None) -> Union[
         "geo_bypass": True,
         "geo_bypass_country": "IN",
         "concurrent_fragment_downloads": 32,
+        "progress_hooks": [cancel_hook(cancel)],
     }
 
     if type in ["audio", "song_audio"]:
@@ -174,7 +250,6 @@ async def yt_dlp_download(link: str, type: str, format_id: str = None) -> Union[
             **common_opts,
             "format": "bestaudio[ext=m4a]/bestaudio/best",
             "cookiefile": cookies_file if is_restricted() else None,
-            "outtmpl": f"{download_folder}/%(id)s.%(ext)s",
             "postprocessors": [{
                 "key": "FFmpegExtractAudio",
                 "preferredcodec": "mp3",
@@ -189,18 +264,156 @@ async def yt_dlp_download(link: str, type: str, format_id: str = None) -> Union[
             **common_opts,
             "format": format_str,
             "cookiefile": cookies_file if is_restricted() else None,
-            "outtmpl": f"{download_folder}/%(id)s.%(ext)s",
             "merge_output_format": "mp4",
             "prefer_ffmpeg": True,
         }
 
-    return await loop.run_in_executor(None, _download_ytdlp, link, opts)
+    try:
+        result = await loop.run_in_executor(None, _download_ytdlp, link, opts, cancel)
+    except asyncio.CancelledError:
+        # Stop the worker thread at its next progress tick instead of letting it run on
+        cancel.set()
+        raise
+    for path in ([result] if isinstance(result, str) else result or []):
+        media_store.add_path(path)
+    return result
 
 
-async def download_audio_concurrent(link: str) -> Union[None, str, List[str]]:
-    existing = file_exists(extract_video_id(link), "audio")
-    if existing:
-        return existing
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def _flight(key: str, factory) -> asyncio.Task:
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return task
+
+
+async def _single_flight(key: str, factory) -> Union[None, str, List[str]]:
+    """Run one download per key; concurrent callers await the same task."""
+    return await asyncio.shield(_flight(key, factory))
+
+
+def inflight_download(key: str) -> Optional[asyncio.Task]:
+    """The download currently running for a ``media_store.key``, if any. Await it shielded."""
+    return _inflight.get(key)
+
+
+class BackendStats:
+    """Rolling latency and success counters for one download backend."""
+
+    def __init__(self, window: int = 50):
+        self.latencies = deque(maxlen=window)
+        self.results = deque(maxlen=window)
+        self.success = 0
+        self.failure = 0
+
+    def record(self, ok: bool, latency: Optional[float] = None) -> None:
+        self.results.append(ok)
+        if ok:
+            self.success += 1
+        else:
+            self.failure += 1
+        if latency is not None:
+            self.latencies.append(latency)
+
+    def success_rate(self) -> float:
+        return sum(self.results) / len(self.results) if self.results else 1.0
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+download_stats = {"api": BackendStats(), "ytdlp": BackendStats()}
+
+HEDGE_MIN_DELAY = 0.5
+
+
+def hedge_delay() -> float:
+    """
+    Seconds to give the API to produce its first bytes before yt-dlp is launched.
+    Tracks the API's recent p90 time-to-first-byte, capped by DOWNLOAD_HEDGE_DELAY,
+    and drops to zero while the API is mostly failing.
+    """
+    api = download_stats["api"]
+    if len(api.results) >= 5 and api.success_rate() < 0.5:
+        return 0.0
+    p90 = api.percentile(0.9)
+    if p90 is None:
+        return config.DOWNLOAD_HEDGE_DELAY
+    return max(HEDGE_MIN_DELAY, min(config.DOWNLOAD_HEDGE_DELAY, p90 * 1.5))
+
+
+async def _timed_api(link: str, file_type: str, first_bytes: asyncio.Event) -> Optional[str]:
+    started = time.monotonic()
+    ttfb = None
+
+    async def mark_first_bytes():
+        nonlocal ttfb
+        await first_bytes.wait()
+        ttfb = time.monotonic() - started
+
+    marker = asyncio.ensure_future(mark_first_bytes())
+    try:
+        result = await asyncio.wait_for(api_download(link, file_type, first_bytes=first_bytes), timeout=60)
+    except Exception:
+        result = None
+    finally:
+        marker.cancel()
+    download_stats["api"].record(bool(result), ttfb if result else None)
+    return result
+
+
+async def _timed_ytdlp(link: str, file_type: str) -> Union[None, str, List[str]]:
+    started = time.monotonic()
+    try:
+        result = await asyncio.wait_for(yt_dlp_download(link, type=file_type), timeout=60)
+    except Exception:
+        result = None
+    download_stats["ytdlp"].record(bool(result), time.monotonic() - started if result else None)
+    return result
+
+
+async def _race_download(link: str, file_type: str) -> Union[None, str, List[str]]:
+    first_bytes = asyncio.Event()
+    api_task = asyncio.ensure_future(_timed_api(link, file_type, first_bytes))
+    waiter = asyncio.ensure_future(first_bytes.wait())
+    try:
+        await asyncio.wait({api_task, waiter}, timeout=hedge_delay(), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        waiter.cancel()
+
+    if api_task.done():
+        if api_task.result():
+            return api_task.result()
+    elif first_bytes.is_set():
+        # The API is already streaming; only fall back if it ends up failing
+        result = await api_task
+        if result:
+            return result
+
+    pending = {api_task, asyncio.ensure_future(_timed_ytdlp(link, file_type))}
+    pending = {task for task in pending if not (task.done() and not task.result())}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.result():
+                    return task.result()
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _download_audio(link: str) -> Union[None, str, List[str]]:
+    if config.DOWNLOAD_RACE_MODE:
+        return await _race_download(link, "audio")
 
     try:
         api_result = await asyncio.wait_for(api_download(link, file_type="audio"), timeout=40)
@@ -216,10 +429,9 @@ async def download_audio_concurrent(link: str) -> Union[None, str, List[str]]:
         return None
 
 
-async def download_video_concurrent(link: str) -> Union[None, str, List[str]]:
-    existing = file_exists(extract_video_id(link), "video")
-    if existing:
-        return existing
+async def _download_video(link: str) -> Union[None, str, List[str]]:
+    if config.DOWNLOAD_RACE_MODE:
+        return await _race_download(link, "video")
 
     try:
         api_result = await asyncio.wait_for(api_download(link, file_type="video"), timeout=30)
@@ -233,3 +445,28 @@ async def download_video_concurrent(link: str) -> Union[None, str, List[str]]:
         return yt_result
     except Exception:
         return None
+
+
+async def download_audio_concurrent(link: str) -> Union[None, str, List[str]]:
+    video_id = extract_video_id(link)
+    existing = file_exists(video_id, "audio")
+    if existing:
+        return existing
+    return await _single_flight(media_store.key(video_id, "audio"), lambda: _download_audio(link))
+
+
+def download_audio_shared(link: str) -> asyncio.Future:
+    """
+    Start (or join) the single-flight audio download for ``link`` without
+    waiting on it. Cancelling the returned future leaves the download running.
+    """
+    video_id = extract_video_id(link)
+    return asyncio.shield(_flight(media_store.key(video_id, "audio"), lambda: _download_audio(link)))
+
+
+async def download_video_concurrent(link: str) -> Union[None, str, List[str]]:
+    video_id = extract_video_id(link)
+    existing = file_exists(video_id, "video")
+    if existing:
+        return existing
+    return await _single_flight(media_store.key(video_id, "video"), lambda: _download_video(link))
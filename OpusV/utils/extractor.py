@@ -0,0 +1,103 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Optional
+
+import config
+from OpusV.logging import LOGGER
+from extractor_worker import ExtractorError, extract_job, ping_job, warm_worker
+
+cookies_file = "OpusV/resources/cookies.txt"
+SOCKET_TIMEOUT = 15
+
+
+class ExtractorPool:
+    """
+    Long-lived pool of yt-dlp worker processes running metadata-only
+    ``extract_info`` jobs. Jobs queue on a semaphore sized to the pool and
+    each one is bounded by a timeout; a slot stays taken until its worker
+    actually finishes. A crashed pool is rebuilt on next use.
+    """
+
+    def __init__(self, workers: int, timeout: float):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # forkserver, not fork: this process runs database, client and
+            # native call threads, and a forked child could inherit their held
+            # locks. Workers come from a clean server process that has only
+            # imported yt-dlp, so rebuilding the pool after a crash is safe too.
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(["extractor_worker"])
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=warm_worker,
+            )
+        return self._executor
+
+    def _reset(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @staticmethod
+    def options(**extra) -> Dict:
+        opts = {
+            "quiet": True,
+            "no_warnings": True,
+            "skip_download": True,
+            "socket_timeout": SOCKET_TIMEOUT,
+            "cookiefile": cookies_file if os.path.exists(cookies_file) else None,
+        }
+        opts.update(extra)
+        return opts
+
+    async def start(self) -> None:
+        """Fork and warm the workers up front so the first lookup doesn't pay for it."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._pool(), ping_job)
+
+    async def extract(
+        self,
+        link: str,
+        opts: Optional[Dict] = None,
+        keys: Optional[Iterable[str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict:
+        """Run ``extract_info(link, download=False)`` in a worker; raises on failure or timeout."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        opts = opts if opts is not None else self.options()
+        keys = tuple(keys) if keys else None
+        await self._slots.acquire()
+        loop = asyncio.get_running_loop()
+        try:
+            job = self._pool().submit(extract_job, link, opts, keys)
+        except BaseException:
+            self._slots.release()
+            raise
+        # A timed-out job keeps its worker busy, so its slot is only freed once the worker is done with it
+        def release(_) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._slots.release)
+
+        job.add_done_callback(release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), timeout or self.timeout)
+        except BrokenProcessPool:
+            LOGGER(__name__).warning("Extractor pool crashed, restarting workers")
+            self._reset()
+            raise
+
+    def close(self) -> None:
+        self._reset()
+
+
+extractor = ExtractorPool(config.EXTRACTOR_WORKERS, config.EXTRACTOR_TIMEOUT)
@@ -0,0 +1,62 @@
+import codecs
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+from OpusV.utils import http_client
+
+HEAD_LIMIT = 1024 * 1024
+
+
+class _HeadMetaParser(HTMLParser):
+    """Collects ``<meta property|name=... content=...>`` tags and stops at the end of ``<head>``."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta: Dict[str, List[str]] = {}
+        self.done = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "body":
+            self.done = True
+        elif tag == "meta":
+            attrs = dict(attrs)
+            name = attrs.get("property") or attrs.get("name")
+            if name and attrs.get("content") is not None:
+                self.meta.setdefault(name, []).append(attrs["content"])
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.done = True
+
+    def feed_bytes(self, chunk: bytes) -> bool:
+        self.feed(self._decoder.decode(chunk))
+        return self.done
+
+
+async def fetch_head_meta(url: str, limit: int = HEAD_LIMIT) -> Optional[Dict[str, List[str]]]:
+    """
+    Stream ``url`` and return its ``<meta>`` tags as ``{property: [content, ...]}``.
+    Reading stops as soon as ``<head>`` is closed (or after ``limit`` bytes).
+    Each chunk is parsed inline: a few KB of ``HTMLParser.feed`` costs less
+    than a hop to the blocking pool, and the limit bounds the total work.
+    Returns None on a non-200 response.
+    """
+    parser = _HeadMetaParser()
+    read = 0
+    async with http_client.stream("GET", url) as response:
+        if response.status_code != 200:
+            return None
+        async for chunk in response.aiter_bytes():
+            read += len(chunk)
+            if parser.feed_bytes(chunk) or read >= limit:
+                break
+    return parser.meta
+
+
+def meta_value(meta: Dict[str, List[str]], name: str) -> Optional[str]:
+    """Value of a meta tag; the last one wins when a page repeats it."""
+    values = meta.get(name)
+    return values[-1] if values else None
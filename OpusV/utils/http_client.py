@@ -0,0 +1,244 @@
+import asyncio
+import socket
+import time
+import urllib.request
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterable, AsyncIterator, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpcore
+import httpx
+
+HOST_CONCURRENCY = 32
+DNS_TTL = 300
+DEFAULT_TIMEOUT = httpx.Timeout(30, connect=10)
+LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=50, keepalive_expiry=60)
+
+
+class _CachedDNSBackend(httpcore.AsyncNetworkBackend):
+    """
+    Wraps httpcore's network backend and resolves hostnames through a small TTL cache.
+    TLS still uses the original hostname for SNI and certificate checks.
+    """
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend, ttl: int = DNS_TTL):
+        self._backend = backend
+        self._ttl = ttl
+        self._cache: Dict[Tuple[str, int], Tuple[float, str]] = {}
+
+    async def _resolve(self, host: str, port: int) -> str:
+        cached = self._cache.get((host, port))
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        address = infos[0][4][0]
+        self._cache[(host, port)] = (time.monotonic() + self._ttl, address)
+        return address
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        try:
+            address = await self._resolve(host, port)
+        except OSError:
+            address = host
+        try:
+            return await self._backend.connect_tcp(
+                address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+            )
+        except (httpcore.ConnectError, httpcore.ConnectTimeout):
+            # The cached address may have gone stale; retry once with a fresh lookup
+            self._cache.pop((host, port), None)
+            if address == host:
+                raise
+            return await self._backend.connect_tcp(
+                host, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+            )
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+# Most specific first: the first matching httpcore error decides the httpx error raised
+_ERRORS = (
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+)
+
+
+def _translate(exc: Exception) -> Exception:
+    for source, target in _ERRORS:
+        if isinstance(exc, source):
+            return target(str(exc))
+    return exc
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream: AsyncIterable[bytes]):
+        self._stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._stream:
+                yield chunk
+        except Exception as exc:
+            raise _translate(exc) from exc
+
+    async def aclose(self) -> None:
+        if hasattr(self._stream, "aclose"):
+            await self._stream.aclose()
+
+
+class _Transport(httpx.AsyncBaseTransport):
+    """
+    httpx transport over an httpcore pool built through its public constructor,
+    so the DNS-caching backend is passed in rather than patched onto private
+    attributes.
+    """
+
+    def __init__(self, http2: bool, limits: httpx.Limits, retries: int, proxy: Optional[str] = None):
+        options = dict(
+            ssl_context=httpx.create_ssl_context(),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            retries=retries,
+            network_backend=_CachedDNSBackend(httpcore.AnyIOBackend()),
+        )
+        if proxy is None:
+            self._pool = httpcore.AsyncConnectionPool(**options)
+            return
+        url = httpx.URL(proxy)
+        proxy_url = httpcore.URL(scheme=url.raw_scheme, host=url.raw_host, port=url.port, target=b"/")
+        auth = (url.username, url.password) if url.username else None
+        pool = httpcore.AsyncSOCKSProxy if url.scheme.startswith("socks") else httpcore.AsyncHTTPProxy
+        self._pool = pool(proxy_url=proxy_url, proxy_auth=auth, **options)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        core_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        try:
+            response = await self._pool.handle_async_request(core_request)
+        except Exception as exc:
+            raise _translate(exc) from exc
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.aclose()
+
+
+def _environment_proxies() -> Dict[str, Optional[str]]:
+    """
+    Mount patterns for the HTTP(S)_PROXY / ALL_PROXY / NO_PROXY settings.
+    httpx ignores them once a transport is passed in, so they are applied
+    here; a None value means that pattern goes direct.
+    """
+    proxies = urllib.request.getproxies()
+    mounts: Dict[str, Optional[str]] = {}
+    for scheme in ("all", "http", "https"):
+        url = proxies.get(scheme)
+        if url:
+            mounts[f"{scheme}://"] = url if "://" in url else f"http://{url}"
+    for host in (proxies.get("no") or "").split(","):
+        host = host.strip().lstrip(".")
+        if host == "*":
+            return {}
+        if host:
+            # Domains also cover their subdomains; IPs and localhost match exactly
+            exact = host == "localhost" or ":" in host or not any(c.isalpha() for c in host)
+            mounts[f"all://{host}" if exact else f"all://*{host}"] = None
+    return mounts if any(mounts.values()) else {}
+
+
+_client: Optional[httpx.AsyncClient] = None
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_client() -> httpx.AsyncClient:
+    """Process-wide keep-alive client, HTTP/2 enabled when the h2 package is installed."""
+    global _client
+    if _client is None or _client.is_closed:
+        try:
+            import h2  # noqa: F401
+
+            http2 = True
+        except ImportError:
+            http2 = False
+        mounts = {
+            pattern: proxy and _Transport(http2=http2, limits=LIMITS, retries=1, proxy=proxy)
+            for pattern, proxy in _environment_proxies().items()
+        }
+        _client = httpx.AsyncClient(
+            transport=_Transport(http2=http2, limits=LIMITS, retries=1),
+            mounts=mounts,
+            timeout=DEFAULT_TIMEOUT,
+            follow_redirects=True,
+        )
+    return _client
+
+
+def _host_limit(url: str) -> asyncio.Semaphore:
+    host = urlsplit(str(url)).hostname or ""
+    limit = _host_limits.get(host)
+    if limit is None:
+        limit = _host_limits[host] = asyncio.Semaphore(HOST_CONCURRENCY)
+    return limit
+
+
+async def request(method: str, url: str, **kwargs) -> httpx.Response:
+    async with _host_limit(url):
+        return await get_client().request(method, url, **kwargs)
+
+
+async def get(url: str, **kwargs) -> httpx.Response:
+    return await request("GET", url, **kwargs)
+
+
+async def post(url: str, **kwargs) -> httpx.Response:
+    return await request("POST", url, **kwargs)
+
+
+@asynccontextmanager
+async def stream(method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+    # The host slot covers the request up to the response headers only, so long
+    # body downloads don't hold it and starve other calls to the same host
+    async with AsyncExitStack() as stack:
+        async with _host_limit(url):
+            response = await stack.enter_async_context(get_client().stream(method, url, **kwargs))
+        yield response
+
+
+async def close() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
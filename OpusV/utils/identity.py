@@ -0,0 +1,59 @@
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import config
+from OpusV.core.mongo import mongodb
+from OpusV.utils.cache import TieredCache
+from OpusV.utils.video_cache import remember_videos
+
+# Query parameters that only carry share/tracking info and never change the track
+TRACKING_PARAMS = {"si", "ls", "app", "context", "nd", "referrer"}
+
+identity_cache = TieredCache(
+    "identity",
+    maxsize=config.IDENTITY_CACHE_SIZE,
+    ttl=config.IDENTITY_CACHE_TTL,
+    collection=mongodb.identitycache if config.PERSISTENT_CACHE else None,
+    negative_ttl=3600,
+)
+
+
+def identity_key(source: str, source_id: str) -> str:
+    return f"{source}:{source_id}"
+
+
+def url_key(source: str, url: str) -> str:
+    """Identity key for a shared link, stable across share parameters and trailing slashes."""
+    parts = urlsplit(url.strip())
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parts.query)
+        if k not in TRACKING_PARAMS and not k.startswith("utm_")
+    ]
+    normalized = urlunsplit(
+        (
+            parts.scheme.lower() or "https",
+            parts.netloc.lower(),
+            parts.path.rstrip("/"),
+            urlencode(sorted(query)),
+            "",
+        )
+    )
+    return identity_key(source, normalized)
+
+
+def remember_identity(key: str, video: Optional[Dict]) -> None:
+    """Record which YouTube video a source track resolved to; ``None`` caches a failed match."""
+    identity_cache.set(key, video or None)
+    if video:
+        remember_videos([video])
+
+
+def track_details(video: Dict) -> Dict:
+    return {
+        "title": video["title"],
+        "link": video["link"],
+        "vidid": video["id"],
+        "duration_min": video["duration"],
+        "thumb": video["thumbnails"][0]["url"].split("?")[0],
+    }
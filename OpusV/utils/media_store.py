@@ -0,0 +1,241 @@
+import asyncio
+import json
+import os
+import shutil
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import config
+from OpusV.logging import LOGGER
+
+download_folder = "downloads"
+AUDIO_EXTS = ("mp3",)
+VIDEO_EXTS = ("mp4", "mkv", "webm")
+FLUSH_DELAY = 5
+WORKDIR_PREFIX = ".ytdlp-"  # per-run yt-dlp scratch directories inside the download folder
+
+
+def media_format(path: str) -> str:
+    return "audio" if path.rsplit(".", 1)[-1] in AUDIO_EXTS else "video"
+
+
+class MediaStore:
+    """
+    Size-bounded cache of downloaded media keyed by ``video_id:format``.
+
+    Files stay on disk after their last queue reference is gone and are only
+    evicted (least recently used first) once the store exceeds its byte budget.
+    Entries pinned by live queues are never evicted.
+    """
+
+    def __init__(self, folder: str, limit_bytes: int):
+        self.folder = folder
+        self.index_file = os.path.join(folder, ".media_index.json")
+        self.limit = limit_bytes
+        self.entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self.paths: Dict[str, str] = {}
+        self.pending: Dict[str, int] = {}
+        self.total = 0
+        self.pinned_bytes = 0
+        self._dirty = False
+        self._over = False
+        self._flush_handle = None
+
+    @staticmethod
+    def key(video_id: str, fmt: str) -> str:
+        return f"{video_id}:{fmt}"
+
+    def load(self) -> None:
+        os.makedirs(self.folder, exist_ok=True)
+        saved = []
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            LOGGER(__name__).warning(f"Media index unreadable, rebuilding: {e}")
+
+        for item in sorted(saved, key=lambda x: x.get("atime", 0)):
+            path = item.get("path")
+            if path and os.path.isfile(path):
+                self._put(item["key"], path, os.path.getsize(path), item.get("atime", 0))
+
+        for name in os.listdir(self.folder):
+            path = f"{self.folder}/{name}"
+            # Left by downloads cut short when the last process died; nothing owns them now
+            if name.startswith(WORKDIR_PREFIX) and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+            if name.endswith(".part") and os.path.isfile(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            if name.startswith(".") or "." not in name:
+                continue
+            video_id, ext = name.rsplit(".", 1)
+            if ext not in AUDIO_EXTS + VIDEO_EXTS:
+                continue
+            if path in self.paths:
+                continue
+            stat = os.stat(path)
+            self._put(self.key(video_id, media_format(path)), path, stat.st_size, stat.st_mtime)
+
+        self._dirty = True
+        self.evict()
+        self.flush()
+        LOGGER(__name__).info(
+            f"Media store loaded: {len(self.entries)} files, {self.total // (1024 * 1024)} MB"
+        )
+
+    def _put(self, key: str, path: str, size: int, atime: float) -> None:
+        old = self.entries.pop(key, None)
+        pins = 0
+        if old:
+            self.total -= old["size"]
+            self.paths.pop(old["path"], None)
+            pins = old["pins"]
+            if pins:
+                self.pinned_bytes -= old["size"]
+        pins += self.pending.pop(path, 0)
+        self.entries[key] = {"path": path, "size": size, "atime": atime, "pins": pins}
+        self.paths[path] = key
+        self.total += size
+        if pins:
+            self.pinned_bytes += size
+
+    def _drop(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.total -= entry["size"]
+            if entry["pins"]:
+                self.pinned_bytes -= entry["size"]
+            self.paths.pop(entry["path"], None)
+            self._dirty = True
+
+    def tracks(self, path: str) -> bool:
+        return path in self.paths
+
+    def get(self, video_id: str, fmt: str) -> Optional[str]:
+        key = self.key(video_id, fmt)
+        entry = self.entries.get(key)
+        if not entry:
+            return None
+        if not os.path.isfile(entry["path"]):
+            self._drop(key)
+            return None
+        entry["atime"] = time.time()
+        self.entries.move_to_end(key)
+        self._dirty = True
+        self._schedule_flush()
+        return entry["path"]
+
+    def add(self, video_id: str, fmt: str, path: str) -> None:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        key = self.key(video_id, fmt)
+        self._put(key, path, size, time.time())
+        self._dirty = True
+        # The new file isn't pinned until its caller gets the path back; never evict it here
+        self.evict(exclude=key)
+        self._schedule_flush()
+
+    def add_path(self, path: str) -> None:
+        name = os.path.basename(path)
+        if "." in name:
+            self.add(name.rsplit(".", 1)[0], media_format(path), path)
+
+    def expect(self, path: str) -> None:
+        """Mark ``path`` as still downloading so pins taken before it lands are kept."""
+        self.pending.setdefault(path, 0)
+
+    def forget(self, path: str) -> None:
+        if not self.pending.get(path):
+            self.pending.pop(path, None)
+
+    def pin(self, path: str) -> None:
+        key = self.paths.get(path)
+        if key:
+            entry = self.entries[key]
+            if not entry["pins"]:
+                self.pinned_bytes += entry["size"]
+            entry["pins"] += 1
+        elif path in self.pending:
+            self.pending[path] += 1
+
+    def unpin(self, path: str) -> None:
+        key = self.paths.get(path)
+        if not key:
+            if self.pending.get(path):
+                self.pending[path] -= 1
+            return
+        entry = self.entries[key]
+        if entry["pins"] == 1:
+            self.pinned_bytes -= entry["size"]
+        entry["pins"] = max(0, entry["pins"] - 1)
+        entry["atime"] = time.time()
+        self.entries.move_to_end(key)
+        self._dirty = True
+        self.evict()
+        self._schedule_flush()
+
+    def evict(self, exclude: Optional[str] = None) -> None:
+        if self.total <= self.limit:
+            self._over = False
+            return
+        for key in list(self.entries):
+            if self.total <= self.limit:
+                break
+            entry = self.entries[key]
+            if entry["pins"] or key == exclude:
+                continue
+            try:
+                os.remove(entry["path"])
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                LOGGER(__name__).warning(f"Failed to evict {entry['path']}: {e}")
+                continue
+            self._drop(key)
+        over = self.total > self.limit
+        if over and not self._over:
+            LOGGER(__name__).warning(
+                f"Media store over budget: {self.total // (1024 * 1024)} MB held by files in live queues "
+                f"(limit {self.limit // (1024 * 1024)} MB)"
+            )
+        self._over = over
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return self.flush()
+        self._flush_handle = loop.call_later(FLUSH_DELAY, self.flush)
+
+    def flush(self) -> None:
+        self._flush_handle = None
+        if not self._dirty:
+            return
+        data = [
+            {"key": key, "path": e["path"], "size": e["size"], "atime": e["atime"]}
+            for key, e in self.entries.items()
+        ]
+        tmp = self.index_file + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.index_file)
+            self._dirty = False
+        except Exception as e:
+            LOGGER(__name__).warning(f"Failed to write media index: {e}")
+
+
+media_store = MediaStore(download_folder, config.MEDIA_CACHE_LIMIT_MB * 1024 * 1024)
+media_store.load()
@@ -1,10 +1,9 @@
-import aiohttp
-
-
 import socket
 from asyncio import get_running_loop
 from functools import partial
 
+from OpusV.utils import http_client
+
 
 def _netcat(host, port, content):
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -28,18 +27,17 @@ async def paste(content):
 BASE = "https://batbin.me/"
 
 
-async def post(url: str, *args, **kwargs):
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, *args, **kwargs) as resp:
-            try:
-                data = await resp.json()
-            except Exception:
-                data = await resp.text()
-        return data
+async def post(url: str, **kwargs):
+    resp = await http_client.post(url, **kwargs)
+    try:
+        data = resp.json()
+    except Exception:
+        data = resp.text
+    return data
 
 
 async def OpusVBin(text):
-    resp = await post(f"{BASE}api/v2/paste", data=text)
+    resp = await post(f"{BASE}api/v2/paste", content=text)
     if not resp["success"]:
         return
     link = BASE + resp["message"]
@@ -0,0 +1,128 @@
+import random
+import time
+from typing import Dict, Iterable, List, Optional
+
+import config
+from OpusV.logging import LOGGER
+from OpusV.utils.exceptions import AssistantErr
+
+NO_ASSISTANT = "ɴᴏ ᴀssɪsᴛᴀɴᴛ ɪs ᴏɴʟɪɴᴇ ʀɪɢʜᴛ ɴᴏᴡ, ᴘʟᴇᴀsᴇ ᴛʀʏ ᴀɢᴀɪɴ ɪɴ ᴀ ᴍᴏᴍᴇɴᴛ."
+
+
+class AssistantLoad:
+    __slots__ = ("calls", "video", "errors", "errors_at", "cooldown_until")
+
+    def __init__(self):
+        self.calls = 0
+        self.video = 0
+        self.errors = 0.0
+        self.errors_at = 0.0
+        self.cooldown_until = 0.0
+
+    def recent_errors(self, now: float) -> float:
+        if not self.errors:
+            return 0.0
+        return self.errors * 0.5 ** ((now - self.errors_at) / config.PLACEMENT_ERROR_HALF_LIFE)
+
+
+class Placement:
+    """
+    Picks the assistant for a new chat by load instead of at random. Each
+    assistant's score is its live calls, with video calls (an extra ffmpeg
+    encode each) weighted higher, plus its recent errors, which decay with a
+    half-life. Assistants cooling down after a FloodWait or a string of
+    failures are skipped while any other one is available.
+    """
+
+    def __init__(self):
+        self.loads: Dict[int, AssistantLoad] = {}
+        self._chats: Dict[int, int] = {}
+        self._video: Dict[int, int] = {}
+
+    def _load(self, assistant: int) -> AssistantLoad:
+        load = self.loads.get(assistant)
+        if load is None:
+            load = self.loads[assistant] = AssistantLoad()
+        return load
+
+    def healthy(self, assistant: int) -> bool:
+        return self._load(assistant).cooldown_until <= time.monotonic()
+
+    def score(self, assistant: int) -> float:
+        load = self._load(assistant)
+        return (
+            load.calls
+            + load.video * config.PLACEMENT_VIDEO_WEIGHT
+            + load.recent_errors(time.monotonic()) * config.PLACEMENT_ERROR_WEIGHT
+        )
+
+    def choose(self, candidates: Iterable[int], exclude: Optional[int] = None) -> int:
+        candidates = list(candidates)
+        if not candidates:
+            raise AssistantErr(NO_ASSISTANT)
+        candidates = [a for a in candidates if a != exclude] or candidates
+        pool = [a for a in candidates if self.healthy(a)] or candidates
+        best = min(self.score(a) for a in pool)
+        return random.choice([a for a in pool if self.score(a) == best])
+
+    # ── live call accounting ──
+
+    def attach(self, chat_id: int, assistant: Optional[int]) -> None:
+        self.detach(chat_id)
+        if assistant is None:
+            return
+        self._chats[chat_id] = assistant
+        self._load(assistant).calls += 1
+
+    def detach(self, chat_id: int) -> None:
+        assistant = self._chats.pop(chat_id, None)
+        if assistant is not None:
+            self._load(assistant).calls -= 1
+        self.video_off(chat_id)
+
+    def video_on(self, chat_id: int) -> None:
+        assistant = self._chats.get(chat_id)
+        if assistant is not None and chat_id not in self._video:
+            self._video[chat_id] = assistant
+            self._load(assistant).video += 1
+
+    def video_off(self, chat_id: int) -> None:
+        assistant = self._video.pop(chat_id, None)
+        if assistant is not None:
+            self._load(assistant).video -= 1
+
+    def assistant_of(self, chat_id: int) -> Optional[int]:
+        return self._chats.get(chat_id)
+
+    def chats_of(self, assistant: int) -> List[int]:
+        return [chat_id for chat_id, owner in self._chats.items() if owner == assistant]
+
+    # ── health ──
+
+    def failure(self, assistant: Optional[int], cooldown: float = 0) -> None:
+        if assistant is None:
+            return
+        now = time.monotonic()
+        load = self._load(assistant)
+        load.errors = load.recent_errors(now) + 1
+        load.errors_at = now
+        if load.errors >= config.PLACEMENT_ERROR_LIMIT:
+            cooldown = max(cooldown, config.PLACEMENT_COOLDOWN)
+        if cooldown:
+            load.cooldown_until = max(load.cooldown_until, now + cooldown)
+            LOGGER(__name__).warning(f"Assistant {assistant} cooling down for {int(cooldown)}s")
+
+    def stats(self) -> Dict[int, Dict[str, float]]:
+        now = time.monotonic()
+        return {
+            assistant: {
+                "calls": load.calls,
+                "video": load.video,
+                "errors": round(load.recent_errors(now), 2),
+                "cooldown": max(0, round(load.cooldown_until - now)),
+            }
+            for assistant, load in self.loads.items()
+        }
+
+
+placement = Placement()
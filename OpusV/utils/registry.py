@@ -0,0 +1,63 @@
+import asyncio
+import inspect
+from typing import Callable, Dict, Iterator, List
+
+from OpusV.logging import LOGGER
+
+
+class ChatRegistry:
+    """
+    Insertion-ordered set of chat ids with O(1) membership and change hooks.
+    Subscribers are called as ``hook(chat_id, added)`` after every real change;
+    coroutine hooks are scheduled on the running loop.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._chats: Dict[int, None] = {}
+        self._hooks: List[Callable] = []
+
+    def __contains__(self, chat_id: int) -> bool:
+        return chat_id in self._chats
+
+    def __len__(self) -> int:
+        return len(self._chats)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.snapshot())
+
+    def snapshot(self) -> List[int]:
+        """Copy of the current chats, safe to iterate across awaits that add or remove chats."""
+        return list(self._chats)
+
+    def add(self, chat_id: int) -> bool:
+        if chat_id in self._chats:
+            return False
+        self._chats[chat_id] = None
+        self._notify(chat_id, True)
+        return True
+
+    def discard(self, chat_id: int) -> bool:
+        if chat_id not in self._chats:
+            return False
+        del self._chats[chat_id]
+        self._notify(chat_id, False)
+        return True
+
+    def subscribe(self, hook: Callable) -> Callable:
+        """Register ``hook(chat_id, added)``; returns it so this can be used as a decorator."""
+        self._hooks.append(hook)
+        return hook
+
+    def unsubscribe(self, hook: Callable) -> None:
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def _notify(self, chat_id: int, added: bool) -> None:
+        for hook in self._hooks:
+            try:
+                result = hook(chat_id, added)
+                if inspect.isawaitable(result):
+                    asyncio.ensure_future(result)
+            except Exception as e:
+                LOGGER(__name__).warning(f"{self.name} registry hook failed for {chat_id}: {e}")
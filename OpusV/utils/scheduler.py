@@ -0,0 +1,112 @@
+import asyncio
+import inspect
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from OpusV.logging import LOGGER
+
+
+class Timer:
+    """Handle for one scheduled callback; ``cancel()`` drops it if it hasn't fired."""
+
+    __slots__ = ("key", "interval", "_owner", "_handle", "_task", "_cancelled")
+
+    def __init__(self, owner: "Scheduler", key: Optional[Hashable], interval: Optional[float]):
+        self._owner = owner
+        self.key = key
+        self.interval = interval
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._task: Optional[asyncio.Task] = None
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> None:
+        self._cancelled = True
+        if self._handle is not None:
+            self._handle.cancel()
+        if self._task is not None and self.interval is not None and self._task is not asyncio.current_task():
+            # A repeating job stops mid-run too; one-shot jobs that already fired finish
+            self._task.cancel()
+        self._owner._drop(self)
+
+
+class Scheduler:
+    """
+    One place for deadlines: one-shot (``call_later``) and repeating (``every``)
+    jobs sit in the event loop's timer heap instead of each owning a sleeping
+    coroutine, and nothing wakes until a deadline is due. Jobs may be plain or
+    async callables. A ``key`` makes a job replace any pending job with the
+    same key, so re-arming a per-chat deadline is one call.
+    """
+
+    def __init__(self):
+        self._keyed: Dict[Hashable, Timer] = {}
+
+    def call_later(self, delay: float, callback: Callable, *args, key: Optional[Hashable] = None) -> Timer:
+        return self._arm(Timer(self, key, None), max(0.0, delay), callback, args)
+
+    def every(
+        self,
+        interval: float,
+        callback: Callable,
+        *args,
+        key: Optional[Hashable] = None,
+        first: Optional[float] = None,
+    ) -> Timer:
+        """Run ``callback`` every ``interval`` seconds, measured from the end of the previous run."""
+        return self._arm(Timer(self, key, interval), interval if first is None else first, callback, args)
+
+    def cancel(self, key: Hashable) -> bool:
+        timer = self._keyed.get(key)
+        if timer is None:
+            return False
+        timer.cancel()
+        return True
+
+    def pending(self, key: Hashable) -> bool:
+        return key in self._keyed
+
+    def __len__(self) -> int:
+        return len(self._keyed)
+
+    def _drop(self, timer: Timer) -> None:
+        if timer.key is not None and self._keyed.get(timer.key) is timer:
+            del self._keyed[timer.key]
+
+    def _arm(self, timer: Timer, delay: float, callback: Callable, args: tuple) -> Timer:
+        if timer.key is not None:
+            previous = self._keyed.get(timer.key)
+            if previous is not None and previous is not timer:
+                previous.cancel()
+            self._keyed[timer.key] = timer
+        loop = asyncio.get_running_loop()
+        timer._handle = loop.call_later(delay, self._fire, timer, callback, args)
+        return timer
+
+    def _fire(self, timer: Timer, callback: Callable, args: tuple) -> None:
+        timer._handle = None
+        if timer.cancelled:
+            return
+        if timer.interval is None:
+            self._drop(timer)
+        timer._task = asyncio.ensure_future(self._run(timer, callback, args))
+
+    async def _run(self, timer: Timer, callback: Callable, args: tuple) -> Any:
+        try:
+            result = callback(*args)
+            if inspect.isawaitable(result):
+                await result
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            name = getattr(callback, "__qualname__", repr(callback))
+            LOGGER(__name__).warning(f"Scheduled job {name} failed: {e}")
+        finally:
+            timer._task = None
+        if timer.interval is not None and not timer.cancelled:
+            self._arm(timer, timer.interval, callback, args)
+
+
+scheduler = Scheduler()
@@ -1,14 +1,18 @@
 import os
 
 from config import autoclean
+from OpusV.utils.media_store import media_store
 
 
 async def auto_clean(popped):
     try:
         rem = popped["file"]
         autoclean.remove(rem)
+        media_store.unpin(popped.get("pinned") or rem)
         count = autoclean.count(rem)
         if count == 0:
+            if media_store.tracks(rem):
+                return
             if "vid_" not in rem or "live_" not in rem or "index_" not in rem:
                 try:
                     os.remove(rem)
@@ -0,0 +1,74 @@
+import asyncio
+from typing import Dict
+
+import config
+from OpusV import YouTube
+from OpusV.misc import db
+from OpusV.utils.stream.state import QueueItem
+from config import autoclean, time_to_seconds
+
+_resolving: Dict[int, asyncio.Task] = {}
+
+RESOLVING_TITLE = "Resolving…"
+
+
+def is_lazy(item: QueueItem) -> bool:
+    return item.lazy is not None
+
+
+def lazy_title(query: str, videoid: bool) -> str:
+    """What to show for an entry not looked up yet: the search text as typed, never a bare video id."""
+    return RESOLVING_TITLE if videoid else str(query)
+
+
+async def _resolve(item: QueueItem) -> bool:
+    details = await YouTube.details(item["lazy"], item["lazy_videoid"])
+    if not details:
+        return False
+    title, duration_min, duration_sec, thumbnail, vidid = details
+    if str(duration_min) == "None" or duration_sec > config.DURATION_LIMIT:
+        return False
+    try:
+        seconds = time_to_seconds(duration_min) - 3
+    except:
+        seconds = 0
+    item.resolved(title.title(), duration_min, vidid, f"vid_{vidid}", seconds)
+    autoclean.append(item["file"])
+    return True
+
+
+async def resolve_entry(item: QueueItem) -> bool:
+    """Turn a lazy queue entry into a regular ``vid_`` entry in place; False if it can't be played."""
+    if not is_lazy(item):
+        return True
+    key = id(item)
+    task = _resolving.get(key)
+    if task is None:
+        task = _resolving[key] = asyncio.ensure_future(_resolve(item))
+        task.add_done_callback(lambda _: _resolving.pop(key, None))
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        return False
+
+
+async def resolve_upcoming(chat_id: int, count: int) -> None:
+    """
+    Resolve the first ``count`` entries of a chat's queue in parallel. Entries
+    that fail to resolve are dropped and the next ones move up in their place.
+    """
+    while True:
+        queue = db.get(chat_id) or []
+        pending = [item for item in queue[:count] if is_lazy(item)]
+        if not pending:
+            return
+        results = await asyncio.gather(*(resolve_entry(item) for item in pending))
+        failed = {id(item) for item, ok in zip(pending, results) if not ok}
+        if not failed:
+            return
+        queue = db.get(chat_id)
+        if queue is None:
+            return
+        queue[:] = [item for item in queue if id(item) not in failed]
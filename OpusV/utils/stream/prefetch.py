@@ -0,0 +1,95 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import config
+from OpusV import LOGGER, YouTube
+from OpusV.misc import db
+from OpusV.utils.media_store import media_store
+from OpusV.utils.stream.lazy import is_lazy, resolve_upcoming
+from OpusV.utils.stream.state import QueueItem
+
+# Leave this share of the media budget for files that are actually playing
+PREFETCH_HEADROOM = 0.8
+
+
+class Prefetcher:
+    """
+    Downloads upcoming ``vid_`` queue entries (positions 1..depth) in the
+    background so ``Call.play`` finds them on disk when the current track ends.
+    Goes through ``YouTube.download`` so prefetches share its single-flight
+    downloads and live checks with the playback path. A fetched file is pinned
+    against its queue row (``item.pinned``), so LRU eviction can't drop it
+    before the row plays; ``auto_clean`` releases the pin when the row pops.
+    """
+
+    def __init__(self, depth: int, concurrency: int):
+        self.depth = depth
+        self.concurrency = concurrency
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._waiting: Dict[str, List[Tuple[int, QueueItem]]] = {}
+        self._resolving: Dict[int, asyncio.Task] = {}
+
+    def schedule(self, chat_id: int) -> None:
+        if self.depth <= 0:
+            return
+        upcoming = (db.get(chat_id) or [])[1 : 1 + self.depth]
+        if chat_id not in self._resolving and any(is_lazy(item) for item in upcoming):
+            self._resolving[chat_id] = asyncio.ensure_future(self._resolve(chat_id))
+        for item in upcoming:
+            if "vid_" not in str(item.get("file", "")) or not item.get("vidid"):
+                continue
+            if item.pinned:
+                continue
+            video = str(item.get("streamtype")) == "video"
+            fmt = "video" if video else "audio"
+            path = media_store.get(item["vidid"], fmt)
+            if path:
+                self._pin(chat_id, item, path)
+                continue
+            key = media_store.key(item["vidid"], fmt)
+            self._waiting.setdefault(key, []).append((chat_id, item))
+            if key not in self._tasks:
+                self._tasks[key] = asyncio.ensure_future(self._fetch(key, item["vidid"], video))
+
+    @staticmethod
+    def _pin(chat_id: int, item: QueueItem, path: str) -> None:
+        # Only rows still queued; a popped row's pin would never be released
+        if item.pinned or not any(row is item for row in db.get(chat_id) or ()):
+            return
+        media_store.pin(path)
+        item.pinned = path
+
+    async def _resolve(self, chat_id: int) -> None:
+        try:
+            await resolve_upcoming(chat_id, 1 + self.depth)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Resolving queue of {chat_id} failed: {e}")
+            return
+        finally:
+            self._resolving.pop(chat_id, None)
+        self.schedule(chat_id)
+
+    def _has_room(self) -> bool:
+        return media_store.pinned_bytes < media_store.limit * PREFETCH_HEADROOM
+
+    async def _fetch(self, key: str, video_id: str, video: bool) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        path = None
+        try:
+            async with self._slots:
+                path = media_store.get(video_id, "video" if video else "audio")
+                if not path and self._has_room():
+                    path, _ = await YouTube.download(video_id, None, videoid=True, video=video, progressive=False)
+        except Exception as e:
+            LOGGER(__name__).warning(f"Prefetch of {key} failed: {e}")
+        finally:
+            self._tasks.pop(key, None)
+            waiting = self._waiting.pop(key, [])
+        if path and media_store.tracks(path):
+            for chat_id, item in waiting:
+                self._pin(chat_id, item, path)
+
+
+prefetcher = Prefetcher(config.PREFETCH_DEPTH, config.PREFETCH_CONCURRENCY)
@@ -0,0 +1,190 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, Optional
+
+import aiofiles
+
+import config
+from OpusV.logging import LOGGER
+from OpusV.utils.downloader import (
+    download_audio_shared,
+    extract_video_id,
+    file_exists,
+    inflight_download,
+    partials,
+)
+from OpusV.utils.media_store import media_format, media_store
+
+BUFFER_BYTES = config.PROGRESSIVE_BUFFER_KB * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class ProgressiveServer:
+    """
+    Loopback HTTP endpoint that lets ffmpeg start on an API download before it
+    has finished. ``GET /<video_id>/<format>`` follows the ``.part`` file while
+    it grows and falls back to the finished file once it has landed.
+
+    If the download fails partway the connection is held open, so ffmpeg
+    stalls instead of seeing a normal end of track, while the fallback
+    download finishes. ``on_fallback(video_id, fmt, download)`` then restarts
+    the affected calls from their position on the complete file.
+    """
+
+    def __init__(self):
+        self.port: Optional[int] = None
+        self.on_fallback: Optional[Callable[[str, str, Awaitable], Awaitable]] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._recoveries: Dict[str, asyncio.Task] = {}
+
+    async def start(self) -> None:
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", config.PROGRESSIVE_PORT)
+        self.port = self._server.sockets[0].getsockname()[1]
+        LOGGER(__name__).info(f"Progressive playback endpoint on 127.0.0.1:{self.port}")
+
+    def url(self, video_id: str, fmt: str) -> str:
+        return f"http://127.0.0.1:{self.port}/{video_id}/{fmt}"
+
+    async def _open(self, video_id: str, fmt: str):
+        partial = partials.get(media_store.key(video_id, fmt))
+        if partial is not None:
+            try:
+                return partial, await aiofiles.open(partial.part, "rb")
+            except FileNotFoundError:
+                # Finished (or failed) between the lookup and the open
+                pass
+        path = media_store.get(video_id, fmt)
+        return None, (await aiofiles.open(path, "rb") if path else None)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = (await reader.readline()).decode(errors="ignore").split()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            target = request[1].strip("/").split("/") if len(request) > 1 else []
+            partial, f = await self._open(*target) if len(target) == 2 else (None, None)
+            if f is None:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                return
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/octet-stream\r\nConnection: close\r\n\r\n"
+            )
+            try:
+                while True:
+                    chunk = await f.read(CHUNK_SIZE)
+                    if chunk:
+                        writer.write(chunk)
+                        await writer.drain()
+                        continue
+                    if partial is None:
+                        break
+                    if partial.done:
+                        if not partial.ok:
+                            LOGGER(__name__).warning(f"Progressive source {partial.path} failed, switching to fallback")
+                            await asyncio.shield(self._recover(*target))
+                            break
+                        # Drain whatever was written after the last read, then stop
+                        partial = None
+                        continue
+                    await partial.wait(1)
+            finally:
+                await f.close()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            LOGGER(__name__).warning(f"Progressive stream failed: {e}")
+        finally:
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    def _recover(self, video_id: str, fmt: str) -> asyncio.Task:
+        """One recovery per source, shared by every connection that was following it."""
+        key = media_store.key(video_id, fmt)
+        task = self._recoveries.get(key)
+        if task is None:
+            task = self._recoveries[key] = asyncio.ensure_future(self._run_recovery(video_id, fmt))
+            task.add_done_callback(lambda _: self._recoveries.pop(key, None))
+        return task
+
+    async def _run_recovery(self, video_id: str, fmt: str) -> None:
+        if self.on_fallback is None:
+            return
+        try:
+            await self.on_fallback(video_id, fmt, fallback_download(video_id, fmt))
+        except Exception as e:
+            LOGGER(__name__).warning(f"Progressive recovery of {video_id} failed: {e}")
+
+
+progressive_server = ProgressiveServer()
+
+
+async def fallback_download(video_id: str, fmt: str) -> Optional[str]:
+    """Path of the complete file once the download behind a failed API stream (its yt-dlp fallback) is done."""
+    task = inflight_download(media_store.key(video_id, fmt))
+    if task is not None:
+        try:
+            await asyncio.shield(task)
+        except Exception:
+            pass
+    return media_store.get(video_id, fmt)
+
+
+async def wait_complete(path: str, timeout: float) -> bool:
+    """Wait until a possibly still downloading media path is complete on disk; False if it isn't in time."""
+    name = os.path.basename(str(path))
+    if "." in name:
+        video_id, fmt = name.rsplit(".", 1)[0], media_format(path)
+        key = media_store.key(video_id, fmt)
+        try:
+            await asyncio.wait_for(_complete(key, video_id, fmt), timeout)
+        except asyncio.TimeoutError:
+            return False
+    return os.path.isfile(path)
+
+
+async def _complete(key: str, video_id: str, fmt: str) -> None:
+    partial = partials.get(key)
+    while partial is not None and not partial.done:
+        await partial.wait(1)
+    if partial is not None and not partial.ok:
+        await fallback_download(video_id, fmt)
+
+
+def progressive_source(path: str) -> str:
+    """Map a media path whose download is still in flight to the progressive endpoint."""
+    if progressive_server.port is None or not isinstance(path, str) or os.path.isfile(path):
+        return path
+    name = os.path.basename(path)
+    if "." not in name:
+        return path
+    video_id, fmt = name.rsplit(".", 1)[0], media_format(path)
+    if media_store.key(video_id, fmt) not in partials:
+        return path
+    return progressive_server.url(video_id, fmt)
+
+
+async def download_audio_progressive(link: str) -> Optional[str]:
+    """
+    Like ``download_audio_concurrent`` but returns the final path as soon as
+    ``PROGRESSIVE_BUFFER_KB`` of an API download is on disk. The download keeps
+    running; players resolve the path through ``progressive_source``.
+    """
+    video_id = extract_video_id(link)
+    existing = file_exists(video_id, "audio")
+    if existing:
+        return existing
+    await progressive_server.start()
+    key = media_store.key(video_id, "audio")
+    task = download_audio_shared(link)
+    while not task.done():
+        partial = partials.get(key)
+        if partial is not None and not partial.done and partial.size >= BUFFER_BYTES:
+            # Only stops this wait; the shared download carries on
+            task.cancel()
+            return partial.path
+        await asyncio.wait({task}, timeout=0.2)
+    return task.result()
@@ -3,6 +3,10 @@ from typing import Union
 
 from OpusV.misc import db
 from OpusV.utils.formatters import check_duration, seconds_to_min
+from OpusV.utils.media_store import media_store
+from OpusV.utils.stream.lazy import lazy_title
+from OpusV.utils.stream.prefetch import prefetcher
+from OpusV.utils.stream.state import ChatQueue, QueueItem
 from config import autoclean, time_to_seconds
 
 
@@ -23,28 +27,58 @@ async def put_queue(
         duration_in_seconds = time_to_seconds(duration) - 3
     except:
         duration_in_seconds = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "user_id": user_id,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": duration_in_seconds,
-        "played": 0,
-    }
+    put = QueueItem(
+        title=title,
+        dur=duration,
+        streamtype=stream,
+        by=user,
+        user_id=user_id,
+        chat_id=original_chat_id,
+        file=file,
+        vidid=vidid,
+        seconds=duration_in_seconds,
+    )
     if forceplay:
         check = db.get(chat_id)
         if check:
-            check.insert(0, put)
+            check.appendleft(put)
         else:
-            db[chat_id] = []
-            db[chat_id].append(put)
+            db[chat_id] = ChatQueue([put])
     else:
         db[chat_id].append(put)
+    if db[chat_id][0] is put:
+        # Landed at the head, so it is what the call is playing now
+        put.started()
     autoclean.append(file)
+    media_store.pin(file)
+    prefetcher.schedule(chat_id)
+
+
+async def put_queue_lazy(
+    chat_id,
+    original_chat_id,
+    query,
+    videoid,
+    user,
+    user_id,
+    stream,
+):
+    # Only the raw query is kept (in ``lazy``); title, duration and id are
+    # looked up once the entry nears the head of the queue (see stream.lazy)
+    put = QueueItem(
+        title=lazy_title(query, videoid),
+        dur="…",
+        streamtype=stream,
+        by=user,
+        user_id=user_id,
+        chat_id=original_chat_id,
+        file=f"lazy_{query}",
+        vidid=query if videoid else "lazy",
+        lazy=query,
+        lazy_videoid=videoid,
+    )
+    db[chat_id].append(put)
+    prefetcher.schedule(chat_id)
 
 
 async def put_queue_index(
@@ -69,23 +103,24 @@ async def put_queue_index(
             dur = 0
     else:
         dur = 0
-    put = {
-        "title": title,
-        "dur": duration,
-        "streamtype": stream,
-        "by": user,
-        "chat_id": original_chat_id,
-        "file": file,
-        "vidid": vidid,
-        "seconds": dur,
-        "played": 0,
-    }
+    put = QueueItem(
+        title=title,
+        dur=duration,
+        streamtype=stream,
+        by=user,
+        chat_id=original_chat_id,
+        file=file,
+        vidid=vidid,
+        seconds=dur,
+    )
     if forceplay:
         check = db.get(chat_id)
         if check:
-            check.insert(0, put)
+            check.appendleft(put)
         else:
-            db[chat_id] = []
-            db[chat_id].append(put)
+            db[chat_id] = ChatQueue([put])
     else:
         db[chat_id].append(put)
+    if db[chat_id][0] is put:
+        # Landed at the head, so it is what the call is playing now
+        put.started()
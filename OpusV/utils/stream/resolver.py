@@ -0,0 +1,52 @@
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
+
+import config
+
+
+async def resolve_ordered(
+    items: Iterable[Any],
+    resolve: Callable[[Any], Awaitable[Any]],
+    concurrency: Optional[int] = None,
+) -> AsyncIterator[Any]:
+    """
+    Run ``resolve`` over ``items`` with at most ``concurrency`` lookups in
+    flight and yield results in input order as soon as each is ready.
+    A failed lookup yields its exception instead of a result.
+    Close the generator (``contextlib.aclosing``) when stopping early so
+    lookups still in flight are cancelled.
+    """
+    concurrency = max(1, concurrency or config.PLAYLIST_RESOLVE_CONCURRENCY)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run(item):
+        async with slots:
+            return await resolve(item)
+
+    source = iter(items)
+    window: deque = deque()
+
+    def fill() -> None:
+        # Look a bit further ahead than the semaphore so a slow head entry
+        # doesn't leave the other slots idle
+        while len(window) < concurrency * 2:
+            try:
+                item = next(source)
+            except StopIteration:
+                return
+            window.append(asyncio.ensure_future(run(item)))
+
+    try:
+        fill()
+        while window:
+            task = window.popleft()
+            try:
+                result = await task
+            except Exception as e:
+                result = e
+            fill()
+            yield result
+    finally:
+        for task in window:
+            task.cancel()
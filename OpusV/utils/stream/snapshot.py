@@ -0,0 +1,116 @@
+import asyncio
+import os
+import time
+from typing import Optional
+
+import config
+from OpusV.core.call import Space
+from OpusV.core.mongo import mongodb
+from OpusV.logging import LOGGER
+from OpusV.misc import db
+from OpusV.utils.database import (
+    get_active_chats,
+    get_loop,
+    is_active_video_chat,
+    is_music_playing,
+    set_loop,
+)
+from OpusV.utils.media_store import media_store
+from OpusV.utils.stream.autoclear import auto_clean
+from OpusV.utils.stream.lazy import is_lazy
+from OpusV.utils.stream.prefetch import prefetcher
+from OpusV.utils.stream.state import ChatQueue, QueueItem
+from config import autoclean
+
+snapshotdb = mongodb.hotrestart
+
+SNAPSHOT_ID = "calls"
+RESUME_CONCURRENCY = 5  # chats rejoined at once after a restart
+
+
+async def save_snapshot() -> int:
+    """
+    Store every live chat's queue (with the played offset and speed of the
+    current track), loop count and pause/video state so the next process can
+    pick the calls back up. Returns how many chats were saved.
+    """
+    chats = []
+    for chat_id in await get_active_chats():
+        queue = db.get(chat_id)
+        if not queue:
+            continue
+        chats.append(
+            {
+                "chat_id": chat_id,
+                "video": await is_active_video_chat(chat_id),
+                "paused": not await is_music_playing(chat_id),
+                "loop": await get_loop(chat_id),
+                "queue": [item.to_state() for item in queue],
+            }
+        )
+    await snapshotdb.update_one(
+        {"_id": SNAPSHOT_ID},
+        {"$set": {"saved_at": time.time(), "chats": chats}},
+        upsert=True,
+    )
+    LOGGER(__name__).info(f"Saved {len(chats)} live calls for the next start")
+    return len(chats)
+
+
+def _restored(item: QueueItem) -> Optional[QueueItem]:
+    """
+    Pin and register a saved row the way put_queue does. A file that was
+    still downloading when the last process stopped goes back to a ``vid_``
+    row so it downloads again; one that can't be fetched again is dropped.
+    """
+    if is_lazy(item):
+        return item
+    if item.pinned and not os.path.isfile(item.pinned):
+        item.pinned = None
+    file = str(item.file)
+    stream = any(tag in file for tag in ("vid_", "live_", "index_")) or "://" in file
+    if not stream and (file.endswith(".part") or not os.path.isfile(file)):
+        name = os.path.basename(file[: -len(".part")] if file.endswith(".part") else file)
+        if os.path.splitext(name)[0] != item.vidid:
+            # Not a YouTube download (e.g. a Telegram file), nothing to fetch it from
+            return None
+        item.file = f"vid_{item.vidid}"
+    autoclean.append(item.file)
+    media_store.pin(item.pinned or item.file)
+    return item
+
+
+async def _resume(entry: dict, limit: asyncio.Semaphore) -> bool:
+    chat_id = entry["chat_id"]
+    rows = (_restored(QueueItem.from_state(state)) for state in entry["queue"])
+    queue = ChatQueue(item for item in rows if item is not None)
+    if not queue:
+        return False
+    async with limit:
+        db[chat_id] = queue
+        await set_loop(chat_id, entry.get("loop", 0))
+        if await Space.resume(chat_id, entry.get("video", False), entry.get("paused", False)):
+            prefetcher.schedule(chat_id)
+            return True
+        db[chat_id] = ChatQueue()
+        for item in queue:
+            await auto_clean(item)
+        await set_loop(chat_id, 0)
+        return False
+
+
+async def restore_snapshot() -> None:
+    """Rejoin the calls saved by the previous process. A snapshot is used at most once."""
+    doc = await snapshotdb.find_one_and_delete({"_id": SNAPSHOT_ID})
+    if not doc or not doc.get("chats"):
+        return
+    age = time.time() - doc.get("saved_at", 0)
+    if age > config.HOT_RESTART_MAX_AGE:
+        LOGGER(__name__).info(f"Skipping call snapshot from {int(age)}s ago")
+        return
+    limit = asyncio.Semaphore(RESUME_CONCURRENCY)
+    results = await asyncio.gather(
+        *(_resume(entry, limit) for entry in doc["chats"]), return_exceptions=True
+    )
+    resumed = sum(result is True for result in results)
+    LOGGER(__name__).info(f"Resumed {resumed}/{len(results)} calls from the last run")
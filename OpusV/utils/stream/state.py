@@ -0,0 +1,240 @@
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Optional
+
+_UNSET = object()
+
+
+class QueueItem:
+    """
+    One queued track. Fields live in ``__slots__`` so a long queue costs a
+    fraction of the equivalent dicts; mapping-style access (``item["file"]``,
+    ``item.get(...)``) is kept for callers that treat rows as dicts. Optional
+    fields are None until set, and ``"name" in item`` is True only when set.
+
+    ``played`` is derived from a monotonic clock: an offset plus the time since
+    the clock was last started, capped at ``seconds``. Nothing has to tick it.
+    """
+
+    __slots__ = (
+        "title",
+        "dur",
+        "streamtype",
+        "by",
+        "user_id",
+        "chat_id",
+        "file",
+        "vidid",
+        "seconds",
+        "_offset",
+        "_since",
+        "old_dur",
+        "old_second",
+        "speed_path",
+        "speed",
+        "mystic",
+        "markup",
+        "pinned",
+        "lazy",
+        "lazy_videoid",
+    )
+    _FIELDS = frozenset(name for name in __slots__ if not name.startswith("_")) | {"played"}
+    # What survives a restart; the now-playing message and its markup don't
+    _STATE = tuple(sorted(_FIELDS - {"mystic", "markup"}))
+
+    def __init__(
+        self,
+        title: str,
+        dur: Any,
+        streamtype: str,
+        by: str,
+        chat_id: int,
+        file: str,
+        vidid: str,
+        seconds: int = 0,
+        user_id: Optional[int] = None,
+        lazy: Optional[str] = None,
+        lazy_videoid: Optional[bool] = None,
+    ):
+        self.title = title
+        self.dur = dur
+        self.streamtype = streamtype
+        self.by = by
+        self.user_id = user_id
+        self.chat_id = chat_id
+        self.file = file
+        self.vidid = vidid
+        self.seconds = seconds
+        self._offset = 0.0
+        self._since = None
+        self.old_dur = None
+        self.old_second = None
+        self.speed_path = None
+        self.speed = None
+        self.mystic = None
+        self.markup = None
+        self.pinned = None
+        self.lazy = lazy
+        self.lazy_videoid = lazy_videoid
+
+    def __repr__(self) -> str:
+        return f"QueueItem({self.file!r}, {self.title!r})"
+
+    @property
+    def played(self) -> int:
+        # Live and unknown-length streams never advanced under the old per-second ticker either
+        if not self.seconds:
+            return int(self._offset)
+        elapsed = self._offset
+        if self._since is not None:
+            elapsed += time.monotonic() - self._since
+        return int(min(elapsed, max(self.seconds, self._offset)))
+
+    @played.setter
+    def played(self, value: float) -> None:
+        self._offset = value
+        if self._since is not None:
+            self._since = time.monotonic()
+
+    @property
+    def running(self) -> bool:
+        return self._since is not None
+
+    # ── mapping compatibility ──
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self._FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._FIELDS and getattr(self, key) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in self._FIELDS else None
+        return default if value is None else value
+
+    def pop(self, key: str, default: Any = _UNSET) -> Any:
+        value = self.get(key)
+        if value is None:
+            if default is _UNSET:
+                raise KeyError(key)
+            return default
+        setattr(self, key, None)
+        return value
+
+    def update(self, values: Optional[dict] = None, **kwargs) -> None:
+        for key, value in {**(values or {}), **kwargs}.items():
+            self[key] = value
+
+    def copy(self) -> "QueueItem":
+        clone = object.__new__(QueueItem)
+        for key in self.__slots__:
+            setattr(clone, key, getattr(self, key))
+        return clone
+
+    # ── restart snapshots ──
+
+    def to_state(self) -> dict:
+        return {key: getattr(self, key) for key in self._STATE if getattr(self, key) is not None}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "QueueItem":
+        item = cls(
+            state["title"],
+            state["dur"],
+            state["streamtype"],
+            state["by"],
+            state["chat_id"],
+            state["file"],
+            state["vidid"],
+        )
+        for key in cls._STATE:
+            if key in state:
+                setattr(item, key, state[key])
+        return item
+
+    # ── state transitions ──
+
+    def resolved(self, title: str, dur: Any, vidid: str, file: str, seconds: int) -> None:
+        """A lazy entry got its real metadata."""
+        self.title, self.dur, self.vidid, self.file, self.seconds = title, dur, vidid, file, seconds
+        self.lazy = self.lazy_videoid = None
+
+    def started(self) -> None:
+        """Playback (re)starts from the top at normal speed."""
+        self._offset, self._since = 0.0, time.monotonic()
+        if self.old_dur:
+            self.dur, self.seconds = self.old_dur, self.old_second
+            self.speed_path, self.speed = None, 1.0
+
+    def sped_up(self, speed: float, path: str, dur: Any, seconds: int, played: int) -> None:
+        if not self.old_dur:
+            self.old_dur, self.old_second = self.dur, self.seconds
+        self.played, self.dur, self.seconds = played, dur, seconds
+        self.speed_path, self.speed = path, speed
+
+    def normal_speed(self) -> None:
+        """Drop a speed-up, mapping the offset back onto the original track."""
+        if self.old_dur:
+            self.played = self.played * (self.speed or 1.0)
+            self.dur, self.seconds = self.old_dur, self.old_second
+            self.old_dur = self.old_second = None
+        self.speed_path, self.speed = None, 1.0
+
+    def seeked(self, delta: int) -> None:
+        self.played = max(0, self.played + delta)
+
+    def paused(self) -> None:
+        if self._since is not None:
+            self._offset += time.monotonic() - self._since
+            self._since = None
+
+    def resumed(self) -> None:
+        if self._since is None:
+            self._since = time.monotonic()
+
+    def shown(self, mystic: Any, markup: str) -> None:
+        """Remember the now-playing message and which button set it carries."""
+        self.mystic, self.markup = mystic, markup
+
+
+class ChatQueue(deque):
+    """
+    A chat's queue: O(1) pops at the head, with the list operations the bot
+    relies on (``pop(0)``, ``insert``, slicing, slice assignment) kept working.
+    """
+
+    __slots__ = ()
+
+    def pop(self, index: int = -1) -> QueueItem:
+        if index == 0:
+            return self.popleft()
+        if index == -1:
+            return super().pop()
+        item = self[index]
+        del self[index]
+        return item
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step > 0:
+                return list(islice(self, start, stop, step))
+            return list(self)[index]
+        return super().__getitem__(index)
+
+    def __setitem__(self, index, value) -> None:
+        if isinstance(index, slice):
+            items = list(self)
+            items[index] = value
+            self.clear()
+            self.extend(items)
+            return
+        super().__setitem__(index, value)
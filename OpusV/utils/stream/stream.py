@@ -1,4 +1,5 @@
 import os
+from contextlib import aclosing
 from random import randint
 from typing import Union
 
@@ -12,7 +13,10 @@ from OpusV.utils.database import add_active_video_chat, is_active_chat
 from OpusV.utils.exceptions import AssistantErr
 from OpusV.utils.inline import aq_markup, close_markup, stream_markup
 from OpusV.utils.pastebin import OpusVBin
-from OpusV.utils.stream.queue import put_queue, put_queue_index
+from OpusV.utils.stream.lazy import lazy_title
+from OpusV.utils.stream.queue import put_queue, put_queue_index, put_queue_lazy
+from OpusV.utils.stream.resolver import resolve_ordered
+from OpusV.utils.stream.state import ChatQueue
 from OpusV.utils.thumbnails import get_thumb
 from OpusV.utils.errors import capture_internal_err
 
@@ -37,87 +41,108 @@ async def stream(
     if streamtype == "playlist":
         msg = f"{_['play_19']}\n\n"
         count = 0
-        for search in result:
-            if int(count) == config.PLAYLIST_FETCH_LIMIT:
-                continue
-            try:
-                (
-                    title,
-                    duration_min,
-                    duration_sec,
-                    thumbnail,
-                    vidid,
-                ) = await YouTube.details(search, False if spotify else True)
-            except:
-                continue
-            if str(duration_min) == "None":
-                continue
-            if duration_sec > config.DURATION_LIMIT:
-                continue
-            if await is_active_chat(chat_id):
-                await put_queue(
+        # Lookups run in parallel; entries are queued in playlist order as they resolve,
+        # so the first track starts playing while the rest are still being looked up.
+        # In lazy mode everything after the first playing track is queued unresolved.
+        videoid = False if spotify else True
+        lazy = config.LAZY_PLAYLIST_QUEUE
+        consumed = 0
+        if not (lazy and await is_active_chat(chat_id)):
+            resolved = resolve_ordered(result, lambda search: YouTube.details(search, videoid))
+            async with aclosing(resolved):
+                async for details in resolved:
+                    consumed += 1
+                    if int(count) == config.PLAYLIST_FETCH_LIMIT:
+                        break
+                    if not details or isinstance(details, Exception):
+                        continue
+                    title, duration_min, duration_sec, thumbnail, vidid = details
+                    if str(duration_min) == "None":
+                        continue
+                    if duration_sec > config.DURATION_LIMIT:
+                        continue
+                    if await is_active_chat(chat_id):
+                        await put_queue(
+                            chat_id,
+                            original_chat_id,
+                            f"vid_{vidid}",
+                            title,
+                            duration_min,
+                            user_name,
+                            vidid,
+                            user_id,
+                            "video" if video else "audio",
+                        )
+                        position = len(db.get(chat_id)) - 1
+                        count += 1
+                        msg += f"{count}. {title[:70]}\n"
+                        msg += f"{_['play_20']} {position}\n\n"
+                    else:
+                        if not forceplay:
+                            db[chat_id] = ChatQueue()
+                        status = True if video else None
+                        try:
+                            file_path, direct = await YouTube.download(
+                                vidid, mystic, video=status, videoid=True
+                            )
+                        except:
+                            await app.send_message(
+                                chat_id=original_chat_id,
+                                text=_["play_14"]
+                            )
+                            return
+                        await Space.join_call(
+                            chat_id,
+                            original_chat_id,
+                            file_path,
+                            video=status,
+                            image=thumbnail,
+                        )
+                        await put_queue(
+                            chat_id,
+                            original_chat_id,
+                            file_path if direct else f"vid_{vidid}",
+                            title,
+                            duration_min,
+                            user_name,
+                            vidid,
+                            user_id,
+                            "video" if video else "audio",
+                            forceplay=forceplay,
+                        )
+                        img = await get_thumb(vidid)
+                        button = stream_markup(_, chat_id)
+                        run = await app.send_photo(
+                            original_chat_id,
+                            photo=img,
+                            caption=_["stream_1"].format(
+                                f"https://t.me/{app.username}?start=info_{vidid}",
+                                title[:23],
+                                duration_min,
+                                user_name,
+                            ),
+                            reply_markup=InlineKeyboardMarkup(button),
+                        )
+                        db[chat_id][0].shown(run, "stream")
+                    if lazy and await is_active_chat(chat_id):
+                        break
+        if lazy:
+            for search in result[consumed:]:
+                if int(count) == config.PLAYLIST_FETCH_LIMIT:
+                    break
+                await put_queue_lazy(
                     chat_id,
                     original_chat_id,
-                    f"vid_{vidid}",
-                    title,
-                    duration_min,
+                    search,
+                    videoid,
                     user_name,
-                    vidid,
                     user_id,
                     "video" if video else "audio",
                 )
                 position = len(db.get(chat_id)) - 1
                 count += 1
-                msg += f"{count}. {title[:70]}\n"
+                msg += f"{count}. {lazy_title(search, videoid)[:70]}\n"
                 msg += f"{_['play_20']} {position}\n\n"
-            else:
-                if not forceplay:
-                    db[chat_id] = []
-                status = True if video else None
-                try:
-                    file_path, direct = await YouTube.download(
-                        vidid, mystic, video=status, videoid=True
-                    )
-                except:
-                    await app.send_message(
-                        chat_id=original_chat_id,
-                        text=_["play_14"]
-                    )
-                    return
-                await Space.join_call(
-                    chat_id,
-                    original_chat_id,
-                    file_path,
-                    video=status,
-                    image=thumbnail,
-                )
-                await put_queue(
-                    chat_id,
-                    original_chat_id,
-                    file_path if direct else f"vid_{vidid}",
-                    title,
-                    duration_min,
-                    user_name,
-                    vidid,
-                    user_id,
-                    "video" if video else "audio",
-                    forceplay=forceplay,
-                )
-                img = await get_thumb(vidid)
-                button = stream_markup(_, chat_id)
-                run = await app.send_photo(
-                    original_chat_id,
-                    photo=img,
-                    caption=_["stream_1"].format(
-                        f"https://t.me/{app.username}?start=info_{vidid}",
-                        title[:23],
-                        duration_min,
-                        user_name,
-                    ),
-                    reply_markup=InlineKeyboardMarkup(button),
-                )
-                db[chat_id][0]["mystic"] = run
-                db[chat_id][0]["markup"] = "stream"
         if count == 0:
             return
         else:
@@ -173,7 +198,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             await Space.join_call(
                 chat_id,
                 original_chat_id,
@@ -206,8 +231,7 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "stream"
+            db[chat_id][0].shown(run, "stream")
     elif streamtype == "soundcloud":
         file_path = result["filepath"]
         title = result["title"]
@@ -233,7 +257,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             await Space.join_call(chat_id, original_chat_id, file_path, video=None)
             await put_queue(
                 chat_id,
@@ -256,8 +280,7 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].shown(run, "tg")
     elif streamtype == "telegram":
         file_path = result["path"]
         link = result["link"]
@@ -285,7 +308,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             await Space.join_call(chat_id, original_chat_id, file_path, video=status)
             await put_queue(
                 chat_id,
@@ -308,8 +331,7 @@ async def stream(
                 caption=_["stream_1"].format(link, title[:23], duration_min, user_name),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].shown(run, "tg")
     elif streamtype == "live":
         link = result["link"]
         vidid = result["vidid"]
@@ -338,7 +360,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             n, file_path = await YouTube.video(link)
             if n == 0:
                 await app.send_message(
@@ -378,8 +400,7 @@ async def stream(
                 ),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].shown(run, "tg")
     elif streamtype == "index":
         link = result
         title = "ɪɴᴅᴇx ᴏʀ ᴍ3ᴜ8 ʟɪɴᴋ"
@@ -403,7 +424,7 @@ async def stream(
             )
         else:
             if not forceplay:
-                db[chat_id] = []
+                db[chat_id] = ChatQueue()
             await Space.join_call(
                 chat_id,
                 original_chat_id,
@@ -428,6 +449,5 @@ async def stream(
                 caption=_["stream_2"].format(user_name),
                 reply_markup=InlineKeyboardMarkup(button),
             )
-            db[chat_id][0]["mystic"] = run
-            db[chat_id][0]["markup"] = "tg"
+            db[chat_id][0].shown(run, "tg")
             await mystic.delete()
@@ -1,11 +1,13 @@
 import os
 import re
 import aiofiles
-import aiohttp
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont, ImageOps, ImageEnhance, ImageFilter
 from youtubesearchpython.__future__ import VideosSearch
 from config import FAILED
+from OpusV.utils import http_client
+from OpusV.utils.cache import MISSING
+from OpusV.utils.video_cache import get_video, remember_videos
 
 APPLE_TEMPLATE_PATH = "OpusV/assets/apple_music.png"
 
@@ -164,15 +166,20 @@ async def get_thumb(videoid):
     url = f"https://www.youtube.com/watch?v={videoid}"
 
     try:
-        search = VideosSearch(url, limit=1)
-        try:
-            results = await search.next()
-        except TypeError:
-            results = search.result()
-        if not results or "result" not in results or not results["result"]:
+        r0 = await get_video(videoid)
+        if r0 is MISSING:
+            search = VideosSearch(url, limit=1)
+            try:
+                results = await search.next()
+            except TypeError:
+                results = search.result()
+            if not results or "result" not in results or not results["result"]:
+                return FAILED
+            remember_videos(results["result"])
+            r0 = results["result"][0]
+        if not r0:
             return FAILED
 
-        r0 = results["result"][0]
         title = re.sub(r"\s+", " ", r0.get("title", "Unknown Title")).strip()
         channel = r0.get("channel", {})
         if isinstance(channel, dict):
@@ -193,12 +200,11 @@ async def get_thumb(videoid):
         os.makedirs("cache", exist_ok=True)
         raw_path = f"cache/raw_{videoid}.jpg"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(thumbnail_url) as resp:
-                if resp.status != 200:
-                    return FAILED
-                async with aiofiles.open(raw_path, "wb") as f:
-                    await f.write(await resp.read())
+        resp = await http_client.get(thumbnail_url)
+        if resp.status_code != 200:
+            return FAILED
+        async with aiofiles.open(raw_path, "wb") as f:
+            await f.write(resp.content)
 
         if not os.path.exists(APPLE_TEMPLATE_PATH):
             return FAILED
@@ -0,0 +1,50 @@
+import re
+from typing import Dict, Iterable, Optional
+
+import config
+from OpusV.core.mongo import mongodb
+from OpusV.utils.cache import MISSING, TieredCache
+from OpusV.utils.formatters import seconds_to_min
+
+VIDEO_ID_RE = re.compile(r"(?:v=|youtu\.be/|shorts/|live/|^)([A-Za-z0-9_-]{11})(?:[?&#/]|$)")
+
+video_cache = TieredCache(
+    "video",
+    maxsize=config.VIDEO_CACHE_SIZE,
+    ttl=config.VIDEO_CACHE_TTL,
+    collection=mongodb.videocache if config.PERSISTENT_CACHE else None,
+    negative_ttl=300,
+)
+
+
+def video_id_of(link: str) -> Optional[str]:
+    match = VIDEO_ID_RE.search(link or "")
+    return match.group(1) if match else None
+
+
+def remember_videos(results: Iterable[Dict]) -> None:
+    """Batch-fill the cache from any VideosSearch style result list."""
+    for result in results or []:
+        if result and result.get("id"):
+            video_cache.set(result["id"], result)
+
+
+def from_ytdlp(info: Dict) -> Dict:
+    """Trim a yt-dlp info dict down to the VideosSearch shape the cache stores."""
+    duration = info.get("duration")
+    return {
+        "id": info.get("id", ""),
+        "title": info.get("title", ""),
+        "duration": seconds_to_min(duration) if isinstance(duration, (int, float)) else duration,
+        "thumbnails": [{"url": info.get("thumbnail", "")}],
+        "link": info.get("webpage_url", ""),
+        "channel": {"name": info.get("uploader") or info.get("channel") or "Youtube"},
+        "is_live": info.get("is_live"),
+    }
+
+
+async def get_video(video_id: str):
+    """Cached info for ``video_id``; ``None`` for a known miss, ``MISSING`` if never looked up."""
+    if not video_id:
+        return MISSING
+    return await video_cache.get(video_id)
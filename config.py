@@ -57,25 +57,73 @@ AUTO_LEAVE_ASSISTANT_TIME = int(getenv("ASSISTANT_LEAVE_TIME", "11500"))
 
 # ───── Error Handling ───── #
 DEBUG_IGNORE_LOG =True
+LOOP_BLOCK_DEBUG = getenv("LOOP_BLOCK_DEBUG", "False") == str(True)  # log stacks of loop stalls
+LOOP_BLOCK_THRESHOLD_MS = int(getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
 
 # ───── Spotify Credentials ───── #
 SPOTIFY_CLIENT_ID = getenv("SPOTIFY_CLIENT_ID", "22b6125bfe224587b722d6815002db2b")
 SPOTIFY_CLIENT_SECRET = getenv("SPOTIFY_CLIENT_SECRET", "c9c63c6fbf2f467c8bc68624851e9773")
 
 # ───── Session Strings ───── #
-STRING1 = getenv("STRING_SESSION")
-STRING2 = getenv("STRING_SESSION2")
-STRING3 = getenv("STRING_SESSION3")
-STRING4 = getenv("STRING_SESSION4")
-STRING5 = getenv("STRING_SESSION5")
+MAX_ASSISTANTS = int(getenv("MAX_ASSISTANTS", "50"))  # highest STRING_SESSION<n> slot read
+# Assistant number -> session; STRING_SESSION is #1, STRING_SESSION2 is #2 and so on. Gaps keep their numbers.
+STRING_SESSIONS = {
+    number: session
+    for number, session in (
+        (n, getenv("STRING_SESSION" if n == 1 else f"STRING_SESSION{n}")) for n in range(1, MAX_ASSISTANTS + 1)
+    )
+    if session
+}
 
 # ───── Server Settings ───── #
 SERVER_PLAYLIST_LIMIT = int(getenv("SERVER_PLAYLIST_LIMIT", "3000"))
 PLAYLIST_FETCH_LIMIT = int(getenv("PLAYLIST_FETCH_LIMIT", "400"))
+PLAYLIST_RESOLVE_CONCURRENCY = int(getenv("PLAYLIST_RESOLVE_CONCURRENCY", "8"))  # parallel playlist lookups
+LAZY_PLAYLIST_QUEUE = getenv("LAZY_PLAYLIST_QUEUE", "True") == str(True)  # resolve playlist entries near the head only
 
 AUTO_SUGGESTION_MODE = getenv("AUTO_SUGGESTION_MODE", "False")
 
 AUTO_SUGGESTION_TIME = int(getenv("AUTO_SUGGESTION_TIME", "60"))
+CLEANMODE_DELETE_MINS = int(getenv("CLEANMODE_DELETE_MINS", "5"))  # suggestion messages are deleted after this
+
+# ───── Media Cache ───── #
+MEDIA_CACHE_LIMIT_MB = int(getenv("MEDIA_CACHE_LIMIT_MB", "5120"))  # byte budget for downloads/
+DOWNLOAD_RACE_MODE = getenv("DOWNLOAD_RACE_MODE", "True") == str(True)  # race api against yt-dlp
+DOWNLOAD_HEDGE_DELAY = float(getenv("DOWNLOAD_HEDGE_DELAY", "4"))  # max seconds before yt-dlp joins the race
+PREFETCH_DEPTH = int(getenv("PREFETCH_DEPTH", "2"))  # upcoming queue entries to download ahead, 0 disables
+PREFETCH_CONCURRENCY = int(getenv("PREFETCH_CONCURRENCY", "3"))  # prefetch downloads across all chats
+PROGRESSIVE_PLAYBACK = getenv("PROGRESSIVE_PLAYBACK", "True") == str(True)  # start audio before the download ends
+PROGRESSIVE_BUFFER_KB = int(getenv("PROGRESSIVE_BUFFER_KB", "512"))  # buffered before playback starts
+PROGRESSIVE_PORT = int(getenv("PROGRESSIVE_PORT", "0"))  # loopback port, 0 picks a free one
+
+# ───── Lookup Caches ───── #
+PERSISTENT_CACHE = getenv("PERSISTENT_CACHE", "True") == str(True)  # keep caches in mongo across restarts
+SEARCH_CACHE_SIZE = int(getenv("SEARCH_CACHE_SIZE", "5000"))
+SEARCH_CACHE_TTL = int(getenv("SEARCH_CACHE_TTL", "86400"))  # seconds
+VIDEO_CACHE_SIZE = int(getenv("VIDEO_CACHE_SIZE", "20000"))
+VIDEO_CACHE_TTL = int(getenv("VIDEO_CACHE_TTL", "604800"))  # seconds
+IDENTITY_CACHE_SIZE = int(getenv("IDENTITY_CACHE_SIZE", "50000"))  # spotify/apple/resso -> youtube matches
+IDENTITY_CACHE_TTL = int(getenv("IDENTITY_CACHE_TTL", "2592000"))  # seconds
+
+# ───── Extractor Pool ───── #
+EXTRACTOR_WORKERS = int(getenv("EXTRACTOR_WORKERS", "2"))  # yt-dlp worker processes
+EXTRACTOR_TIMEOUT = float(getenv("EXTRACTOR_TIMEOUT", "30"))  # seconds per metadata lookup
+BLOCKING_WORKERS = int(getenv("BLOCKING_WORKERS", "8"))  # threads for blocking downloads/parsing
+
+# ───── Assistant Placement ───── #
+PLACEMENT_VIDEO_WEIGHT = float(getenv("PLACEMENT_VIDEO_WEIGHT", "2"))  # extra load of a video call
+PLACEMENT_ERROR_WEIGHT = float(getenv("PLACEMENT_ERROR_WEIGHT", "3"))  # load added per recent error
+PLACEMENT_ERROR_HALF_LIFE = float(getenv("PLACEMENT_ERROR_HALF_LIFE", "300"))  # seconds
+PLACEMENT_ERROR_LIMIT = float(getenv("PLACEMENT_ERROR_LIMIT", "3"))  # recent errors before a cooldown
+PLACEMENT_COOLDOWN = int(getenv("PLACEMENT_COOLDOWN", "120"))  # seconds an unhealthy assistant is skipped
+LIVE_MIGRATION = getenv("LIVE_MIGRATION", "True") == str(True)  # move calls off unhealthy assistants
+MIGRATION_CHECK_INTERVAL = int(getenv("MIGRATION_CHECK_INTERVAL", "15"))  # seconds between health checks
+
+# ───── Startup ───── #
+JOIN_RATE = float(getenv("JOIN_RATE", "2"))  # support-group joins per second, all assistants together
+JOIN_BURST = int(getenv("JOIN_BURST", "5"))  # joins allowed back to back before the rate applies
+HOT_RESTART = getenv("HOT_RESTART", "True") == str(True)  # resume live calls after a restart or deploy
+HOT_RESTART_MAX_AGE = int(getenv("HOT_RESTART_MAX_AGE", "600"))  # seconds a saved snapshot stays usable
 
 # ───── Bot Media Assets ───── #
 
@@ -0,0 +1,37 @@
+"""
+Jobs run inside the yt-dlp extractor processes (see OpusV/utils/extractor.py).
+
+Kept outside the OpusV package on purpose: workers import this module by
+name, and importing anything under OpusV would run the package's startup
+side effects (clients, database, git) in every worker.
+"""
+from typing import Dict, Optional
+
+
+class ExtractorError(Exception):
+    pass
+
+
+def warm_worker() -> None:
+    # Pay the extractor import once instead of once per lookup
+    import yt_dlp  # noqa: F401
+    import yt_dlp.extractor  # noqa: F401
+
+
+def extract_job(link: str, opts: Dict, keys: Optional[tuple]) -> Dict:
+    from yt_dlp import YoutubeDL
+
+    try:
+        with YoutubeDL(opts) as ydl:
+            info = ydl.sanitize_info(ydl.extract_info(link, download=False)) or {}
+    except Exception as e:
+        # yt-dlp errors carry unpicklable state, send back only the message
+        raise ExtractorError(str(e)) from None
+    if keys:
+        # Only ship back what the caller reads; full info dicts are large to pickle
+        return {key: info.get(key) for key in keys}
+    return info
+
+
+def ping_job() -> bool:
+    return True